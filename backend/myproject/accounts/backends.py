@@ -0,0 +1,55 @@
+"""
+Authentication backend that loads the signed-in user from the cache.
+
+With sessions in signed cookies, ``ModelBackend.get_user()`` is the last
+query authentication runs on every request. This backend keeps the user row
+in the cache instead, under a generation key (see ``myproject.caching``).
+``accounts.signals`` moves it to a new generation whenever the row is saved
+or deleted, so a new password (which also fails the session hash
+check and signs the user out), deactivation or a change of the staff and
+superuser flags takes effect on the next request. ``QuerySet.update()`` skips
+those signals; call ``invalidate()`` after using it on users.
+
+That only holds when every worker shares the cache: with a per-process
+cache, other workers serve the old row until it times out. ``check
+--deploy`` reports that setup (``accounts.E001``).
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from myproject import caching
+
+
+def cache_key(user_id):
+    return f'accounts:user:{user_id}'
+
+
+def invalidate(user_id):
+    caching.invalidate(cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` with cached user lookups. Inactive or missing users are
+    not cached, so they cost a query each time, as before.
+    """
+
+    def get_user(self, user_id):
+        key = caching.versioned(cache_key(user_id))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.ACCOUNTS_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        key = await caching.aversioned(cache_key(user_id))
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, settings.ACCOUNTS_USER_CACHE_TIMEOUT)
+        return user
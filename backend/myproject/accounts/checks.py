@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PER_PROCESS_CACHES = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@register(Tags.caches, deploy=True)
+def check_user_cache(app_configs, **kwargs):
+    """
+    ``CachedModelBackend`` needs a cache every worker shares: invalidation
+    only reaches the cache of the process that saved the user, so others
+    would keep serving the old row (and password hash).
+    """
+    if 'accounts.backends.CachedModelBackend' not in settings.AUTHENTICATION_BACKENDS:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PER_PROCESS_CACHES:
+        return []
+    return [Error(
+        'CachedModelBackend is used with a per-process default cache.',
+        hint=(
+            'Configure a shared cache (Redis, Memcached, database) so saving '
+            'a user invalidates it for every worker, or switch to ModelBackend.'
+        ),
+        id='accounts.E001',
+    )]
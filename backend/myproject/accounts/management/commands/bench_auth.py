@@ -0,0 +1,85 @@
+import statistics
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from bench.datagen import Generator, Sizes
+from bench.drivers import WSGIDriver
+from bench.runner import Runner, parse_mix, percentile, throwaway_database
+
+SETUPS = {
+    # Django's defaults: a session row and a user row read per request.
+    'database': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    },
+    'cookie': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'AUTHENTICATION_BACKENDS': ['accounts.backends.CachedModelBackend'],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare database sessions with ModelBackend (Django\'s defaults) '
+        'against signed-cookie sessions with the cached user backend: replay '
+        'the same seeded workload through both, in alternating rounds, and '
+        'report throughput, latency and queries per request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=6)
+        parser.add_argument('--requests', type=int, default=1_000)
+        parser.add_argument('--sessions', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--mix', type=parse_mix, default=parse_mix('me=70,pantry=30'),
+            help='Operation weights, e.g. "me=70,pantry=30".',
+        )
+
+    def handle(self, *args, **options):
+        usernames = [f'user{number}' for number in range(options['sessions'])]
+        with override_settings(ALLOWED_HOSTS=['testserver']), throwaway_database():
+            Generator(
+                Sizes(users=options['sessions'], recipes=500, ingredients=200),
+                options['seed'],
+            ).run()
+            runners, sessions = {}, {}
+            for label, setup in SETUPS.items():
+                # The session middleware reads SESSION_ENGINE once, when the
+                # handler is built; backends are looked up on every request.
+                with override_settings(**setup):
+                    runners[label] = Runner(
+                        WSGIDriver(WSGIHandler()), usernames, options['mix'], options['seed']
+                    )
+                    sessions[label] = runners[label].login()
+                    runners[label].replay(sessions[label], runners[label].plan(200, 'warmup'))
+            plan = runners['database'].plan(options['requests'])
+
+            rounds = {label: [] for label in SETUPS}
+            latencies = {label: [] for label in SETUPS}
+            queries = {label: [] for label in SETUPS}
+            for number in range(options['rounds']):
+                order = list(SETUPS) if number % 2 == 0 else list(reversed(SETUPS))
+                for label in order:
+                    with override_settings(**SETUPS[label]):
+                        samples, wall = runners[label].replay(sessions[label], plan)
+                    rows = [row for rows in samples.values() for row in rows]
+                    if any(row[2] != 200 for row in rows):
+                        raise CommandError(f'{label}: some requests failed')
+                    rounds[label].append(wall)
+                    latencies[label].extend(row[0] for row in rows)
+                    queries[label].extend(row[1] for row in rows)
+
+        for label in SETUPS:
+            median = statistics.median(rounds[label])
+            self.stdout.write(
+                f'{label:>9}: {options["requests"] / median:.1f} req/s, '
+                f'p50 {percentile(latencies[label], 50) * 1e3:.2f}ms, '
+                f'p99 {percentile(latencies[label], 99) * 1e3:.2f}ms, '
+                f'{statistics.mean(queries[label]):.2f} queries per request'
+            )
+        speedup = statistics.median(rounds['database']) / statistics.median(rounds['cookie'])
+        self.stdout.write(f'cookie sessions: {speedup:.2f}x the throughput of database sessions')
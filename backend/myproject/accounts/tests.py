@@ -0,0 +1,125 @@
+import datetime
+import io
+
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from myproject.caching import versioned
+
+from .backends import cache_key
+from .checks import check_user_cache
+
+
+class LoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('cook', password='pw')
+
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        token = self.client.get(reverse('accounts:csrf')).json()['csrf_token']
+        self.headers = {'X-CSRFToken': token}
+
+    def login(self, payload):
+        return self.client.post(
+            reverse('accounts:login'), payload, content_type='application/json',
+            headers=self.headers,
+        )
+
+    def test_login_and_logout(self):
+        response = self.login({'username': 'cook', 'password': 'pw'})
+        self.assertEqual(response.json(), {'id': self.user.pk, 'username': 'cook'})
+        self.assertEqual(self.client.session[SESSION_KEY], str(self.user.pk))
+        # Login rotates the CSRF token.
+        self.headers['X-CSRFToken'] = self.client.cookies['csrftoken'].value
+        self.assertEqual(
+            self.client.post(reverse('accounts:logout'), headers=self.headers).status_code, 204
+        )
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_stay_signed_in(self):
+        self.login({'username': 'cook', 'password': 'pw'})
+        self.assertEqual(self.client.cookies['sessionid']['max-age'], 14 * 24 * 60 * 60)
+        self.headers['X-CSRFToken'] = self.client.cookies['csrftoken'].value
+        self.login({'username': 'cook', 'password': 'pw', 'stay_signed_in': False})
+        self.assertEqual(self.client.cookies['sessionid']['max-age'], '')
+
+    def test_bad_credentials(self):
+        self.assertEqual(self.login({'username': 'cook', 'password': 'nope'}).status_code, 401)
+        self.assertEqual(self.login({'username': 'cook'}).status_code, 400)
+
+    def test_requires_csrf_token(self):
+        self.headers = {}
+        self.assertEqual(self.login({'username': 'cook', 'password': 'pw'}).status_code, 403)
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('cook', password='pw')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_warm_requests_run_no_queries(self):
+        self.assertEqual(self.client.get(reverse('accounts:me')).json()['username'], 'cook')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('accounts:me')).status_code, 200)
+
+    def test_password_change_signs_out(self):
+        self.client.get(reverse('accounts:me'))
+        self.user.set_password('new')
+        self.user.save()
+        self.assertIsNone(cache.get(versioned(cache_key(self.user.pk))))
+        self.assertEqual(self.client.get(reverse('accounts:me')).status_code, 401)
+
+    def test_late_write_back_is_not_served(self):
+        # A reader loads the row and picks its key, then the user is
+        # deactivated, then the reader stores what it loaded.
+        key = versioned(cache_key(self.user.pk))
+        stale = get_user_model().objects.get(pk=self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save(update_fields=['is_active'])
+        cache.set(key, stale)
+        self.assertEqual(self.client.get(reverse('accounts:me')).status_code, 401)
+
+    def test_deactivation_signs_out(self):
+        self.client.get(reverse('accounts:me'))
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get(reverse('accounts:me')).status_code, 401)
+
+
+class UserCacheCheckTests(SimpleTestCase):
+    def test_requires_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_user_cache(None)], ['accounts.E001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_user_cache(None), [])
+        backends = ['django.contrib.auth.backends.ModelBackend']
+        with override_settings(AUTHENTICATION_BACKENDS=backends):
+            self.assertEqual(check_user_cache(None), [])
+
+
+class PruneSessionsTests(TestCase):
+    def test_deletes_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for number in range(7):
+            Session.objects.create(
+                session_key=f'expired{number}', session_data='',
+                expire_date=now - datetime.timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key='current', session_data='', expire_date=now + datetime.timedelta(days=1)
+        )
+        out = io.StringIO()
+        call_command('prune_sessions', batch_size=3, stdout=out)
+        self.assertIn('Deleted 7 expired', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)), ['current'])
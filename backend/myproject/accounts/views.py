@@ -0,0 +1,51 @@
+from django.contrib.auth import aauthenticate, alogin, alogout
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import require_GET, require_POST
+
+from myproject.api import api_login_required, parse_json
+
+
+@require_GET
+@ensure_csrf_cookie
+async def csrf_view(request):
+    """Set the CSRF cookie the single-page app echoes back in ``X-CSRFToken``."""
+    return JsonResponse({'csrf_token': get_token(request)})
+
+
+@require_POST
+async def login_view(request):
+    """
+    Start a session from ``{"username": ..., "password": ...}``. It lasts
+    ``SESSION_COOKIE_AGE`` (14 days) unless ``"stay_signed_in": false``, in
+    which case it ends when the browser closes.
+    """
+    payload = parse_json(request)
+    if payload is None or not all(
+        isinstance(payload.get(field), str) for field in ('username', 'password')
+    ):
+        return JsonResponse(
+            {'error': 'Expected a JSON object with "username" and "password".'}, status=400
+        )
+    user = await aauthenticate(
+        request, username=payload['username'], password=payload['password']
+    )
+    if user is None:
+        return JsonResponse({'error': 'Invalid username or password.'}, status=401)
+    await alogin(request, user)
+    if not payload.get('stay_signed_in', True):
+        await request.session.aset_expiry(0)
+    return JsonResponse({'id': user.pk, 'username': user.get_username()})
+
+
+@require_POST
+async def logout_view(request):
+    await alogout(request)
+    return HttpResponse(status=204)
+
+
+@require_GET
+@api_login_required
+async def me_view(request):
+    return JsonResponse({'id': request.user.pk, 'username': request.user.get_username()})
@@ -0,0 +1,242 @@
+"""
+Deterministic synthetic PantryPilot data.
+
+The same seed and sizes always produce the same rows (and, on an empty
+database, the same primary keys), so benchmark runs are comparable. Rows are
+written with ``bulk_create`` in batches, which skips model signals: the
+radar index is invalidated and the dashboard stats are reconciled once at
+the end instead.
+"""
+
+import datetime
+import random
+from dataclasses import dataclass
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from pantry.models import PantryLot
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.quantities import normalize
+from recipes.radar import radar
+from stats.services import reconcile
+
+BENCH_PASSWORD = 'pantrypilot'
+
+WORDS = (
+    'roasted harissa lemon dill salmon fennel slaw gochujang chicken lettuce '
+    'wraps coconut lentil curry chickpea spinach gnocchi pesto basil miso '
+    'glazed ribs smoky garlic ginger noodle soup tofu crispy sheet pan tray '
+    'bake stew braised pork beef mushroom risotto tomato feta couscous bowl '
+    'tacos black bean avocado lime cilantro yogurt herb sweet potato kale'
+).split()
+TAGS = [
+    'Vegetarian', 'Vegan', 'High-protein', 'Sheet-pan', 'Comfort',
+    'Pescatarian', 'Gluten-free', 'Meal-prep', 'Quick', 'Weekend',
+]
+SYLLABLES = 'ka lo mi ne ra su ti vo ba de fi gu ho ja ke li mo nu pa re'.split()
+PANTRY_STAPLES = [
+    'Milk', 'Eggs', 'Butter', 'Garlic', 'Onions', 'Rice', 'Pasta', 'Tomatoes',
+    'Lemons', 'Limes', 'Carrots', 'Baby spinach', 'Parmesan', 'Chickpeas',
+    'Chicken thighs', 'Greek yogurt', 'Cheddar', 'Fresh basil', 'Gnocchi', 'Salmon',
+]
+QUANTITIES = ['1L', '500ml', '120g', '1/2 wedge', '4 pcs', '2 cans', '1 bunch', '2 packs']
+REQUIREMENTS = ['200g', '1 cup', '2 tbsp', '1', '400 ml', '1/2 tsp', '2', '100 g', '']
+# (weight, first day, last day) relative to today; None means no expiry date.
+EXPIRY_SPREAD = [
+    (10, -10, -1),
+    (15, 0, 2),
+    (20, 3, 7),
+    (45, 8, 120),
+    (10, None, None),
+]
+
+
+@dataclass(frozen=True)
+class Sizes:
+    users: int = 100
+    recipes: int = 10_000
+    ingredients: int = 2_000
+    lots_per_user: int = 40
+
+
+def zipf_weights(count, exponent=1.0):
+    """Cumulative weights for ``random.choices``: rank ``n`` is drawn ~ 1/n**s."""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def made_up_words(rng, count, exclude=()):
+    """``count`` distinct pronounceable words, in a deterministic order."""
+    seen, words = set(exclude), []
+    while len(words) < count:
+        word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Generator:
+    """
+    Writes one seeded dataset. Ingredient popularity is Zipf-like and shared
+    by recipes and pantries, so radar and search see realistic overlap.
+    """
+
+    def __init__(self, sizes, seed=1, batch_size=10_000, today=None, log=None):
+        self.sizes = sizes
+        self.seed = seed
+        self.batch_size = batch_size
+        self.today = today or timezone.localdate()
+        self.log = log or (lambda message: None)
+
+    def rng(self, stream):
+        # One generator per table keeps each table reproducible on its own.
+        return random.Random(f'{self.seed}:{stream}')
+
+    def run(self):
+        self.tags = Tag.objects.bulk_create(Tag(name=name) for name in TAGS)
+        self.create_ingredients()
+        self.create_recipes()
+        user_ids = self.create_users()
+        self.create_lots(user_ids)
+        radar.invalidate()
+        self.log('reconciling dashboard stats')
+        reconcile(user_ids)
+
+    def create_ingredients(self):
+        rng = self.rng('ingredients')
+        count = self.sizes.ingredients
+        staples = PANTRY_STAPLES[:count]
+        names = staples + [
+            word.capitalize()
+            for word in made_up_words(rng, count - len(staples), {name.lower() for name in staples})
+        ]
+        ingredients = Ingredient.objects.bulk_create(
+            (Ingredient(name=name) for name in names), batch_size=self.batch_size
+        )
+        self.log(f'{len(ingredients)} ingredients')
+        self.use_ingredients({ingredient.pk: ingredient.name for ingredient in ingredients})
+
+    def use_ingredients(self, names):
+        """Draw from ``names`` (id -> name, most popular first) from now on."""
+        self.names = names
+        self.ingredients = list(names)
+        self.ingredient_weights = zipf_weights(len(self.ingredients), 0.9)
+
+    def recipe_ingredients(self, rng):
+        """The ingredient ids of one recipe, sorted."""
+        return sorted(set(rng.choices(
+            self.ingredients, cum_weights=self.ingredient_weights, k=rng.randint(5, 12)
+        )))
+
+    def create_recipes(self):
+        rng = self.rng('recipes')
+        words = WORDS + made_up_words(rng, 5_000, WORDS)
+        rng.shuffle(words)
+        word_weights = zipf_weights(len(words), 1.07)
+        created = 0
+        through = Recipe.tags.through
+        for batch in batched(range(self.sizes.recipes), self.batch_size):
+            with transaction.atomic():
+                recipes = Recipe.objects.bulk_create([
+                    Recipe(
+                        title=' '.join(
+                            rng.choices(words, cum_weights=word_weights, k=rng.randint(3, 5))
+                        ).title(),
+                        summary=' '.join(
+                            rng.choices(words, cum_weights=word_weights, k=rng.randint(8, 14))
+                        ),
+                        ready_in_minutes=rng.randrange(10, 120, 5),
+                        difficulty=rng.choices(Recipe.Difficulty.values, weights=[6, 3, 1])[0],
+                    )
+                    for _ in batch
+                ])
+                through.objects.bulk_create([
+                    through(recipe_id=recipe.pk, tag_id=tag.pk)
+                    for recipe in recipes
+                    for tag in rng.sample(self.tags, rng.randint(0, 3))
+                ])
+                RecipeIngredient.objects.bulk_create([
+                    self.quantified(
+                        RecipeIngredient(recipe_id=recipe.pk, ingredient_id=ingredient_id),
+                        rng.choice(REQUIREMENTS),
+                    )
+                    for recipe in recipes
+                    for ingredient_id in self.recipe_ingredients(rng)
+                ])
+            created += len(batch)
+            self.log(f'{created} recipes')
+
+    def create_users(self):
+        # Hashing is deliberately slow; every user shares one precomputed hash.
+        password = make_password(BENCH_PASSWORD, salt=f'bench{self.seed}')
+        User = get_user_model()
+        user_ids = []
+        for batch in batched(range(self.sizes.users), self.batch_size):
+            users = User.objects.bulk_create(
+                User(username=f'user{number}', password=password) for number in batch
+            )
+            user_ids.extend(user.pk for user in users)
+        self.log(f'{len(user_ids)} users')
+        return user_ids
+
+    def quantified(self, row, quantity):
+        row.quantity = quantity
+        row.amount, row.dimension, row.unit = normalize(quantity, self.names[row.ingredient_id])
+        return row
+
+    def expiry(self, rng):
+        weight_total = sum(weight for weight, _, _ in EXPIRY_SPREAD)
+        pick = rng.randrange(weight_total)
+        for weight, first, last in EXPIRY_SPREAD:
+            if pick < weight:
+                break
+            pick -= weight
+        if first is None:
+            return None
+        return self.today + datetime.timedelta(days=rng.randint(first, last))
+
+    def pantry(self, rng, user_id):
+        """One user's lots: mostly distinct items, some bought more than once."""
+        now = timezone.now()
+        target = max(1, round(rng.gauss(self.sizes.lots_per_user, self.sizes.lots_per_user / 4)))
+        lots = []
+        while len(lots) < target:
+            ingredient_id = rng.choices(
+                self.ingredients, cum_weights=self.ingredient_weights
+            )[0]
+            # About a quarter of items are duplicates ("Milk 1L" and "Milk 500ml").
+            for _ in range(rng.choices((1, 2, 3), weights=(75, 20, 5))[0]):
+                lots.append(self.quantified(
+                    PantryLot(
+                        user_id=user_id,
+                        ingredient_id=ingredient_id,
+                        expires_on=self.expiry(rng),
+                        added_at=now - datetime.timedelta(minutes=rng.randrange(60 * 24 * 30)),
+                    ),
+                    rng.choice(QUANTITIES),
+                ))
+        return lots
+
+    def create_lots(self, user_ids):
+        rng = self.rng('lots')
+        lots = (lot for user_id in user_ids for lot in self.pantry(rng, user_id))
+        created = 0
+        for batch in batched(lots, self.batch_size):
+            with transaction.atomic():
+                PantryLot.objects.bulk_create(batch)
+            created += len(batch)
+            self.log(f'{created} pantry lots')
+
+
+def generate(sizes, seed=1, **kwargs):
+    Generator(sizes, seed, **kwargs).run()
@@ -0,0 +1,195 @@
+"""
+In-process HTTP clients for the project's WSGI and ASGI entry points.
+
+They call ``myproject.wsgi.application`` / ``myproject.asgi.application``
+directly, so a benchmark measures the whole Django stack (middleware,
+sessions, auth, views, database) without sockets or a server in the way.
+Each ``Session`` is one browser: it keeps its own cookies and echoes the
+CSRF token back on unsafe requests, like the single-page app does.
+"""
+
+import asyncio
+import io
+import json
+import threading
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+@dataclass
+class Response:
+    status: int
+    headers: list
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class QueryCounter:
+    """
+    Counts SQL statements on every database connection of the process.
+
+    Under ASGI each request may run its queries on a different thread (and
+    so a different connection); the wrapper is installed on each connection
+    as it is opened, and on those already open in the calling thread.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self.install)
+        for connection in connections.all(initialized_only=True):
+            self.install(None, connection)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self.install)
+        for connection in connections.all(initialized_only=True):
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+class Session:
+    """A cookie jar plus the request building shared by both drivers."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.cookies = SimpleCookie()
+
+    def request(self, method, path, params=None, data=None):
+        headers = [(b'host', b'testserver')]
+        body = b''
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers.append((b'content-type', b'application/json'))
+        if method not in ('GET', 'HEAD') and settings.CSRF_COOKIE_NAME in self.cookies:
+            headers.append((b'x-csrftoken', self.cookies[settings.CSRF_COOKIE_NAME].value.encode()))
+        if self.cookies:
+            cookie = '; '.join(f'{name}={morsel.value}' for name, morsel in self.cookies.items())
+            headers.append((b'cookie', cookie.encode()))
+        return self.driver.send(
+            self, method, path, urlencode(params or {}, doseq=True), headers, body
+        )
+
+    def store_cookies(self, headers):
+        for name, value in headers:
+            if name.lower() == b'set-cookie':
+                self.cookies.load(value.decode('latin-1'))
+
+
+class WSGIDriver:
+    interface = 'wsgi'
+
+    def __init__(self, application=None):
+        if application is None:
+            from myproject.wsgi import application
+        self.application = application
+
+    def send(self, session, method, path, query_string, headers, body):
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query_string,
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers:
+            name = name.decode().upper().replace('-', '_')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            environ[name] = value.decode('latin-1')
+
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.encode('latin-1'), value.encode('latin-1'))
+                for name, value in response_headers
+            ]
+
+        result = self.application(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            # Fires request_finished, which closes the database connection.
+            if hasattr(result, 'close'):
+                result.close()
+        session.store_cookies(started['headers'])
+        return Response(started['status'], started['headers'], content)
+
+
+class ASGIDriver:
+    """
+    Runs requests on one event loop; ``send`` is a coroutine, so the caller
+    must be too.
+    """
+
+    interface = 'asgi'
+
+    def __init__(self, application=None):
+        if application is None:
+            from myproject.asgi import application
+        self.application = application
+
+    async def send(self, session, method, path, query_string, headers, body):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query_string.encode(),
+            'root_path': '',
+            'headers': headers + [(b'content-length', str(len(body)).encode())],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        response = {'body': []}
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Django watches for a disconnect while the view runs; never send one.
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = message['headers']
+            elif message['type'] == 'http.response.body':
+                response['body'].append(message.get('body', b''))
+
+        await self.application(scope, receive, send)
+        session.store_cookies(response['headers'])
+        return Response(response['status'], response['headers'], b''.join(response['body']))
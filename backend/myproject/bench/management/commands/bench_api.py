@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from bench.datagen import Generator
+from bench.drivers import ASGIDriver, WSGIDriver
+from bench.runner import (
+    DEFAULT_MIX, Runner, compare, load_baseline, parse_mix, save_baseline, summarize,
+    throwaway_database,
+)
+
+from .generate_data import add_size_arguments, sizes_from
+
+DRIVERS = {'wsgi': WSGIDriver, 'asgi': ASGIDriver}
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a seeded dataset on a throwaway on-disk database and replay a '
+        'mixed API workload through the WSGI and/or ASGI application in-process. '
+        'Reports throughput, p50/p95/p99 latency and queries per request; can '
+        'save a JSON baseline and fail when a run regresses against one.'
+    )
+
+    def add_arguments(self, parser):
+        add_size_arguments(parser)
+        parser.set_defaults(users=200, recipes=5_000, ingredients=1_000)
+        parser.add_argument(
+            '--interface', choices=DRIVERS, nargs='+', default=list(DRIVERS)
+        )
+        parser.add_argument('--requests', type=int, default=1_000)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument(
+            '--sessions', type=int, default=10,
+            help='Logged-in users the requests are spread over.',
+        )
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help='Operation weights, e.g. "search=45,pantry=30,radar=23,login=2".',
+        )
+        parser.add_argument('--save-baseline', metavar='PATH')
+        parser.add_argument('--baseline', metavar='PATH')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed slowdown against the baseline, as a fraction (default 0.2).',
+        )
+
+    def handle(self, *args, **options):
+        if options['sessions'] > options['users']:
+            raise CommandError('--sessions cannot exceed --users.')
+        baseline = load_baseline(options['baseline']) if options['baseline'] else None
+        with override_settings(ALLOWED_HOSTS=['testserver']), throwaway_database():
+            Generator(sizes_from(options), options['seed']).run()
+            usernames = [f'user{number}' for number in range(options['sessions'])]
+            results = {}
+            for interface in options['interface']:
+                runner = Runner(DRIVERS[interface](), usernames, options['mix'], options['seed'])
+                results[interface] = summarize(
+                    *runner.run(options['requests'], options['warmup'])
+                )
+                self.report(interface, results[interface])
+
+        meta = {
+            key: options[key]
+            for key in ('seed', 'users', 'recipes', 'ingredients', 'lots_per_user',
+                        'requests', 'warmup', 'sessions', 'mix')
+        }
+        if options['save_baseline']:
+            save_baseline(options['save_baseline'], meta, results)
+            self.stdout.write(f'Baseline saved to {options["save_baseline"]}.')
+        if baseline is not None:
+            if baseline['meta'] != meta:
+                self.stderr.write('Warning: the baseline was recorded with other options.')
+            regressions = compare(baseline['results'], results, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    f'{len(regressions)} regression(s) beyond {options["threshold"]:.0%}:\n  '
+                    + '\n  '.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def report(self, interface, summary):
+        self.stdout.write(f'\n{interface.upper()}')
+        self.stdout.write(
+            f'  {"operation":<10}{"requests":>9}{"errors":>7}{"req/s":>9}'
+            f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"queries":>9}'
+        )
+        for name, figures in summary.items():
+            self.stdout.write(
+                f'  {name:<10}{figures["requests"]:>9}{figures["errors"]:>7}'
+                f'{figures["throughput"]:>9.1f}{figures["p50_ms"]:>9.2f}'
+                f'{figures["p95_ms"]:>9.2f}{figures["p99_ms"]:>9.2f}'
+                f'{figures["queries_per_request"]:>9.2f}'
+            )
@@ -0,0 +1,282 @@
+"""
+Mixed-workload API benchmark and JSON baselines.
+
+A run logs a pool of generated users in, then replays a seeded sequence of
+requests (search, radar, pantry list, login and "who am I", weighted by
+the mix) one at a time through a driver from ``bench.drivers``. Each
+request records its latency, status and the number of SQL statements it
+executed.
+"""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+
+from .datagen import BENCH_PASSWORD, TAGS, WORDS
+from .drivers import QueryCounter, Session
+
+DEFAULT_MIX = {'search': 45, 'pantry': 30, 'radar': 23, 'login': 2}
+# Query counts are deterministic for a seed, so any real increase is a change.
+QUERY_TOLERANCE = 0.1
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+@contextmanager
+def throwaway_database(on_disk=True):
+    """
+    Run against a fresh test database, destroyed afterwards.
+
+    ``DEBUG`` is switched off: otherwise every statement is kept in
+    ``connection.queries`` and long runs measure that list growing.
+    """
+    debug, test_name = settings.DEBUG, connection.settings_dict['TEST']['NAME']
+    settings.DEBUG = False
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if on_disk:
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    directory, 'bench.sqlite3'
+                )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                yield
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        settings.DEBUG = debug
+        connection.settings_dict['TEST']['NAME'] = test_name
+
+
+def search_request(rng, username):
+    words = rng.sample(WORDS[:30], rng.choices((0, 1, 2), weights=(1, 6, 3))[0])
+    if words and rng.random() < 0.3:
+        # Type-ahead: the last word is still being typed.
+        words[-1] = words[-1][:rng.randint(3, max(3, len(words[-1]) - 1))]
+    params = {'q': ' '.join(words)}
+    if rng.random() < 0.3 or not words:
+        params['tag'] = rng.sample(TAGS, rng.randint(1, 2))
+    return 'GET', reverse('recipes:search'), params, None
+
+
+def pantry_request(rng, username):
+    return 'GET', reverse('pantry:lots'), None, None
+
+
+def radar_request(rng, username):
+    return 'GET', reverse('pantry:radar'), None, None
+
+
+def me_request(rng, username):
+    return 'GET', reverse('accounts:me'), None, None
+
+
+def login_request(rng, username):
+    data = {'username': username, 'password': BENCH_PASSWORD}
+    return 'POST', reverse('accounts:login'), None, data
+
+
+WORKLOAD = {
+    'search': search_request,
+    'pantry': pantry_request,
+    'radar': radar_request,
+    'login': login_request,
+    'me': me_request,
+}
+
+
+def parse_mix(value):
+    """Parse ``"search=45,radar=20"`` into a mix; raise ``ValueError`` if invalid."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in WORKLOAD:
+            raise ValueError(f'Unknown operation {name!r}; choose from {", ".join(WORKLOAD)}.')
+        mix[name] = int(weight)
+    if not mix or min(mix.values()) < 0 or not sum(mix.values()):
+        raise ValueError('The mix needs at least one positive weight.')
+    return mix
+
+
+class Runner:
+    def __init__(self, driver, usernames, mix=None, seed=1):
+        self.driver = driver
+        self.usernames = usernames
+        self.mix = mix or DEFAULT_MIX
+        self.seed = seed
+
+    def plan(self, count, salt=''):
+        """
+        The seeded request sequence: ``(operation, user index, request)``.
+        It does not depend on the driver, so WSGI and ASGI replay the same one.
+        """
+        rng = random.Random(f'{self.seed}:{salt}')
+        names = list(self.mix)
+        weights = list(self.mix.values())
+        plan = []
+        for _ in range(count):
+            name = rng.choices(names, weights)[0]
+            user = rng.randrange(len(self.usernames))
+            plan.append((name, user, WORKLOAD[name](rng, self.usernames[user])))
+        return plan
+
+    def login(self):
+        """One logged-in ``Session`` per username."""
+        return drive(self._login())
+
+    def replay(self, sessions, plan):
+        """Return ``{operation: [(seconds, queries, status), ...]}`` and the wall time."""
+        return drive(self._replay(sessions, plan))
+
+    def run(self, requests, warmup=0):
+        """Log in, warm up, then replay ``requests`` requests; see ``replay()``."""
+        if self.driver.interface == 'asgi':
+            return asyncio.run(adrive(self._run(requests, warmup)))
+        return drive(self._run(requests, warmup))
+
+    async def alogin(self):
+        return await adrive(self._login())
+
+    async def areplay(self, sessions, plan):
+        return await adrive(self._replay(sessions, plan))
+
+    # The steps below yield ``(session, request)`` and are sent the response
+    # back, so one implementation serves both the sync and the async driver.
+
+    def _login(self):
+        sessions = [Session(self.driver) for _ in self.usernames]
+        for session, username in zip(sessions, self.usernames):
+            check((yield session, ('GET', reverse('accounts:csrf'))))
+            check((yield session, login_request(None, username)))
+        return sessions
+
+    def _replay(self, sessions, plan):
+        samples = {name: [] for name in self.mix}
+        with QueryCounter() as queries:
+            started = time.perf_counter()
+            for name, user, request in plan:
+                before, tick = queries.count, time.perf_counter()
+                response = yield sessions[user], request
+                samples[name].append(
+                    (time.perf_counter() - tick, queries.count - before, response.status)
+                )
+            wall = time.perf_counter() - started
+        return samples, wall
+
+    def _run(self, requests, warmup):
+        sessions = yield from self._login()
+        yield from self._replay(sessions, self.plan(warmup, 'warmup'))
+        return (yield from self._replay(sessions, self.plan(requests)))
+
+
+def drive(steps):
+    """Run the steps of a ``Runner`` method with a sync driver."""
+    response = None
+    try:
+        while True:
+            session, request = steps.send(response)
+            response = session.request(*request)
+    except StopIteration as done:
+        return done.value
+
+
+async def adrive(steps):
+    """Run the steps of a ``Runner`` method with an async driver."""
+    response = None
+    try:
+        while True:
+            session, request = steps.send(response)
+            response = await session.request(*request)
+    except StopIteration as done:
+        return done.value
+
+
+def check(response):
+    if response.status != 200:
+        raise RuntimeError(f'Setup request failed with {response.status}: {response.body[:200]!r}')
+
+
+def summarize(samples, wall):
+    """Per-operation and overall figures, as stored in a baseline."""
+
+    def figures(rows, seconds):
+        latencies = [row[0] for row in rows]
+        return {
+            'requests': len(rows),
+            'errors': sum(not 200 <= row[2] < 400 for row in rows),
+            'throughput': round(len(rows) / seconds, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1e3, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1e3, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1e3, 3),
+            'queries_per_request': round(sum(row[1] for row in rows) / len(rows), 2),
+        }
+
+    summary = {
+        name: figures(rows, sum(row[0] for row in rows))
+        for name, rows in samples.items() if rows
+    }
+    summary['all'] = figures([row for rows in samples.values() for row in rows], wall)
+    return summary
+
+
+def compare(baseline, current, threshold):
+    """
+    Return a description of every regression of ``current`` against
+    ``baseline`` (both ``{interface: {operation: figures}}``): latency up or
+    throughput down by more than ``threshold`` (a fraction), or more
+    queries per request.
+
+    The p99 is gated per operation only: over the whole mix it lands on the
+    rare slow operation (a login is mostly password hashing) and hides
+    changes to the common ones.
+    """
+    regressions = []
+    for interface, operations in current.items():
+        for name, now in operations.items():
+            before = baseline.get(interface, {}).get(name)
+            if before is None:
+                continue
+            label = f'{interface} {name}'
+            metrics = ('p50_ms', 'p95_ms') if name == 'all' else ('p50_ms', 'p95_ms', 'p99_ms')
+            for metric in metrics:
+                if now[metric] > before[metric] * (1 + threshold):
+                    regressions.append(
+                        f'{label}: {metric} {before[metric]:.2f} -> {now[metric]:.2f}'
+                    )
+            if now['throughput'] < before['throughput'] * (1 - threshold):
+                regressions.append(
+                    f'{label}: throughput {before["throughput"]:.1f} -> {now["throughput"]:.1f} req/s'
+                )
+            if now['queries_per_request'] > before['queries_per_request'] + QUERY_TOLERANCE:
+                regressions.append(
+                    f'{label}: queries per request '
+                    f'{before["queries_per_request"]} -> {now["queries_per_request"]}'
+                )
+            if now['errors'] > before['errors']:
+                regressions.append(f'{label}: errors {before["errors"]} -> {now["errors"]}')
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(path, meta, results):
+    with open(path, 'w') as file:
+        json.dump({'meta': meta, 'results': results}, file, indent=2, sort_keys=True)
+        file.write('\n')
@@ -0,0 +1,120 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pantry.models import PantryLot
+from recipes.models import Ingredient, Recipe, Tag
+from stats.models import UserStats
+
+from .datagen import BENCH_PASSWORD, Generator, Sizes
+from .drivers import ASGIDriver, Session, WSGIDriver
+from .runner import Runner, compare, parse_mix, summarize
+
+SIZES = Sizes(users=4, recipes=60, ingredients=40, lots_per_user=12)
+
+
+def fingerprint():
+    return (
+        list(Recipe.objects.order_by('pk').values_list('title', 'ready_in_minutes')),
+        list(PantryLot.objects.order_by('pk').values_list(
+            'user__username', 'ingredient__name', 'quantity', 'expires_on'
+        )),
+    )
+
+
+class GeneratorTests(TestCase):
+    def setUp(self):
+        self.today = datetime.date(2030, 1, 15)
+        Generator(SIZES, seed=3, today=self.today).run()
+
+    def test_sizes_and_realistic_pantries(self):
+        self.assertEqual(get_user_model().objects.count(), SIZES.users)
+        self.assertEqual(Recipe.objects.count(), SIZES.recipes)
+        self.assertEqual(Ingredient.objects.count(), SIZES.ingredients)
+        self.assertEqual(UserStats.objects.count(), SIZES.users)
+        self.assertTrue(Tag.objects.annotate(n=Count('recipes')).filter(n__gt=0).exists())
+        # Some items are bought more than once, and expiries are spread out.
+        duplicates = (
+            PantryLot.objects.values('user', 'ingredient').annotate(n=Count('id'))
+            .filter(n__gt=1)
+        )
+        self.assertTrue(duplicates.exists())
+        expiries = set(PantryLot.objects.values_list('expires_on', flat=True))
+        self.assertIn(None, expiries)
+        expiries.discard(None)
+        self.assertLess(min(expiries), self.today)
+        self.assertGreater(max(expiries), self.today + datetime.timedelta(days=7))
+
+    def test_same_seed_same_data(self):
+        first = fingerprint()
+        for model in (PantryLot, Recipe, Ingredient, Tag, get_user_model()):
+            model.objects.all().delete()
+        Generator(SIZES, seed=3, today=self.today).run()
+        self.assertEqual(fingerprint(), first)
+
+
+class RunnerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Generator(SIZES, seed=1).run()
+
+    def test_wsgi_run(self):
+        runner = Runner(WSGIDriver(), ['user0'], parse_mix('search=2,pantry=1,radar=1'))
+        summary = summarize(*runner.run(requests=20, warmup=2))
+        self.assertEqual(summary['all']['requests'], 20)
+        self.assertEqual(summary['all']['errors'], 0)
+        self.assertGreater(summary['pantry']['queries_per_request'], 0)
+        self.assertNotIn('login', summary)
+
+    async def test_asgi_replay(self):
+        runner = Runner(ASGIDriver(), ['user0', 'user1'], parse_mix('pantry=1,me=1'))
+        sessions = await runner.alogin()
+        samples, wall = await runner.areplay(sessions, runner.plan(6))
+        rows = [row for rows in samples.values() for row in rows]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row[2] for row in rows}, {200})
+        self.assertGreater(wall, 0)
+
+    async def test_asgi_session_login(self):
+        session = Session(ASGIDriver())
+        await session.request('GET', reverse('accounts:csrf'))
+        response = await session.request(
+            'POST', reverse('accounts:login'),
+            data={'username': 'user1', 'password': BENCH_PASSWORD},
+        )
+        self.assertEqual(response.json()['username'], 'user1')
+        response = await session.request('GET', reverse('pantry:lots'))
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.json()['items'])
+
+
+class CompareTests(TestCase):
+    figures = {
+        'requests': 100, 'errors': 0, 'throughput': 100.0,
+        'p50_ms': 5.0, 'p95_ms': 10.0, 'p99_ms': 20.0, 'queries_per_request': 3.0,
+    }
+
+    def test_regressions_beyond_threshold(self):
+        baseline = {'wsgi': {'search': self.figures}}
+        same = {'wsgi': {'search': dict(self.figures, p95_ms=11.0, throughput=85.0)}}
+        self.assertEqual(compare(baseline, same, 0.2), [])
+        slower = dict(self.figures, p95_ms=13.0, throughput=70.0, queries_per_request=4.0)
+        regressions = compare(baseline, {'wsgi': {'search': slower}}, 0.2)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn('wsgi search: p95_ms 10.00 -> 13.00', regressions)
+        spiky = {'wsgi': {'search': dict(self.figures, p99_ms=30.0)}}
+        self.assertEqual(compare(baseline, spiky, 0.2), ['wsgi search: p99_ms 20.00 -> 30.00'])
+
+    def test_p99_is_gated_per_operation(self):
+        baseline = {'wsgi': {'all': self.figures}}
+        spiky = {'wsgi': {'all': dict(self.figures, p99_ms=30.0)}}
+        self.assertEqual(compare(baseline, spiky, 0.2), [])
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('search=3, login=1'), {'search': 3, 'login': 1})
+        with self.assertRaises(ValueError):
+            parse_mix('checkout=1')
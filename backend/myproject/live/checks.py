@@ -0,0 +1,32 @@
+import asgiref
+from asgiref.sync import SyncToAsync
+from django.core.checks import Warning, register
+
+# release_request_thread() relies on asgiref internals that are only known to
+# work in this range; live.tests.ReleaseRequestThreadTests covers them.
+ASGIREF_VERSIONS = ((3, 8), (4, 0))
+ASGIREF_INTERNALS = ('thread_sensitive_context', 'context_to_thread_executor')
+
+
+def asgiref_version():
+    return tuple(int(part) for part in asgiref.__version__.split('.')[:2])
+
+
+@register()
+def check_asgiref(app_configs, **kwargs):
+    lowest, below = ASGIREF_VERSIONS
+    missing = [name for name in ASGIREF_INTERNALS if not hasattr(SyncToAsync, name)]
+    if missing:
+        return [Warning(
+            f'asgiref {asgiref.__version__} has no SyncToAsync.{missing[0]}.',
+            hint='Live event streams will hold a thread each until they close.',
+            id='live.W001',
+        )]
+    if not lowest <= asgiref_version() < below:
+        return [Warning(
+            f'asgiref {asgiref.__version__} is outside the tested range '
+            f'{".".join(map(str, lowest))} to {".".join(map(str, below))}.',
+            hint='Run live.tests before deploying; event streams use asgiref internals.',
+            id='live.W002',
+        )]
+    return []
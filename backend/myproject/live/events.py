@@ -0,0 +1,47 @@
+"""
+Events pushed to the browser, built from the cached dashboard stats.
+"""
+
+from asgiref.sync import sync_to_async
+
+from stats.services import aget_stats, get_stats, refresh_ready_dishes, summarize
+
+from .pubsub import get_broker, user_channel
+
+
+def pantry_events(summary):
+    return [
+        {'event': 'radar', 'data': {'ready_to_cook': summary['ready_to_cook']}},
+        {
+            'event': 'expiry',
+            'data': {
+                'expiring_soon': summary['expiring_soon'],
+                'within_days': summary['expiring_within_days'],
+                'pantry_items': summary['pantry_items'],
+            },
+        },
+    ]
+
+
+async def initial_events(user_id):
+    return pantry_events(summarize(await aget_stats(user_id)))
+
+
+async def refreshed_events(user_id, today=None):
+    """
+    State to resend when it changed without a pantry write: the catalog
+    (which dishes are ready) or, with ``today``, the date (which lots are
+    expiring or expired).
+    """
+    await sync_to_async(refresh_ready_dishes)(user_id)
+    events = await initial_events(user_id)
+    if today is not None:
+        events.insert(0, {'event': 'date', 'data': {'today': today.isoformat()}})
+    return events
+
+
+def publish_pantry_update(user_id):
+    broker = get_broker()
+    channel = user_channel(user_id)
+    for event in pantry_events(summarize(get_stats(user_id))):
+        broker.publish(channel, event)
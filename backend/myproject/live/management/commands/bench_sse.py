@@ -0,0 +1,166 @@
+import asyncio
+import gc
+import os
+import resource
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from bench.runner import throwaway_database
+from live.pubsub import get_broker, user_channel
+from stats.services import reconcile_user
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StreamClient:
+    """One idle browser tab holding the event stream open."""
+
+    def __init__(self, cookie):
+        self.cookie = cookie
+        self.requested = False
+        self.chunks = 0
+        self.status = None
+        self.ready = asyncio.Event()
+        self.pinged = asyncio.Event()
+        self.disconnected = asyncio.Event()
+
+    def scope(self):
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/api/live/events/',
+            'raw_path': b'/api/live/events/',
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'accept', b'text/event-stream'),
+                (b'cookie', f'{settings.SESSION_COOKIE_NAME}={self.cookie}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            if self.status != 200:
+                self.ready.set()
+        if message['type'] != 'http.response.body':
+            return
+        if not message.get('more_body', False):
+            # The stream ended before it could be held open.
+            self.status = self.status if self.chunks >= 2 else 'closed'
+            self.ready.set()
+            self.pinged.set()
+        if message.get('body'):
+            self.chunks += 1
+            # retry + initial radar and expiry events.
+            if self.chunks == 3:
+                self.ready.set()
+            if message['body'].startswith(b'event: ping'):
+                self.pinged.set()
+
+
+class Command(BaseCommand):
+    help = (
+        'Open many idle Server-Sent Event streams against the ASGI application '
+        'in-process and report memory per connection, threads and fan-out latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--batch', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=['testserver']), throwaway_database():
+            sessions = self.sessions(options['users'])
+            connection.close()
+            asyncio.run(self.run(options, sessions))
+
+    def sessions(self, count):
+        sessions = []
+        for number in range(count):
+            user = get_user_model().objects.create_user(f'bench{number}')
+            client = Client()
+            client.force_login(user)
+            # Streams only read stats; create them up front, as for any
+            # existing user, instead of racing to write the first row.
+            reconcile_user(user.pk)
+            sessions.append((user.pk, client.cookies[settings.SESSION_COOKIE_NAME].value))
+        return sessions
+
+    async def run(self, options, sessions):
+        from myproject.asgi import application
+
+        total = options['connections']
+        clients, tasks = [], []
+        gc.collect()
+        baseline_rss, baseline_threads = current_rss_mb(), threading.active_count()
+
+        started = time.perf_counter()
+        for offset in range(0, total, options['batch']):
+            batch = [
+                StreamClient(sessions[number % len(sessions)][1])
+                for number in range(offset, min(offset + options['batch'], total))
+            ]
+            for client in batch:
+                tasks.append(asyncio.create_task(
+                    application(client.scope(), client.receive, client.send)
+                ))
+            await asyncio.gather(*(client.ready.wait() for client in batch))
+            clients.extend(batch)
+        opened = time.perf_counter() - started
+        failed = sum(client.status != 200 for client in clients)
+        if failed:
+            raise CommandError(f'{failed} stream(s) did not open')
+
+        gc.collect()
+        rss = current_rss_mb()
+        self.stdout.write(
+            f'open streams: {get_broker().subscriber_count()} '
+            f'(opened in {opened:.1f}s, {total / opened:.0f}/s)'
+        )
+        self.stdout.write(
+            f'threads: {threading.active_count()} (baseline {baseline_threads})'
+        )
+        self.stdout.write(
+            f'RSS: {rss:.1f} MB (baseline {baseline_rss:.1f} MB), '
+            f'{(rss - baseline_rss) * 1024 / total:.1f} KB per connection'
+        )
+
+        started = time.perf_counter()
+        for user_id, _ in sessions:
+            get_broker().publish(user_channel(user_id), {'event': 'ping', 'data': {}})
+        await asyncio.gather(*(client.pinged.wait() for client in clients))
+        self.stdout.write(
+            f'fan-out to {total} streams: {(time.perf_counter() - started) * 1e3:.1f}ms'
+        )
+
+        for client in clients:
+            client.disconnected.set()
+        await asyncio.gather(*tasks)
+        self.stdout.write(f'after disconnect: {get_broker().subscriber_count()} open streams')
@@ -0,0 +1,105 @@
+"""
+In-process publish/subscribe used to fan events out to open SSE streams.
+
+The backend is chosen with ``LIVE_PUBSUB_BACKEND``. A backend provides
+``publish(channel, event)``, callable from any thread, and
+``subscribe(channels)``, called from the event loop that will read the
+returned ``Subscription``. ``LocalBackend`` only reaches subscribers in the
+same process; a multi-process deployment plugs in a backend that relays
+through a shared broker (Redis pub/sub, Postgres LISTEN/NOTIFY) and feeds the
+same ``Subscription`` objects.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Delivered in place of events dropped because a subscriber fell behind;
+# the client should refetch instead of applying deltas.
+RESYNC = {'event': 'resync', 'data': {}}
+
+
+class Subscription:
+    """A bounded queue of events for one reader on one event loop."""
+
+    def __init__(self, backend, channels, maxsize):
+        self.backend = backend
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        """Queue ``event`` from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The reader's loop is gone; it will unsubscribe on its way out.
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout=None):
+        """Next event, or ``None`` if ``timeout`` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class LocalBackend:
+    """Fan-out to subscribers of the current process only."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._channels = defaultdict(set)
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return len(subscribers)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._channels.values()))
+
+
+@cache
+def get_broker():
+    config = settings.LIVE_PUBSUB_BACKEND
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
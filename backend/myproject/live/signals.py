@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pantry.models import PantryLot
+from pantry.signals import deleted_with_owner, lots_imported
+
+from .events import publish_pantry_update
+
+
+def schedule_update(user_id):
+    # After commit, so listeners never see state that may still roll back;
+    # the stats receivers are connected earlier, so their post-commit
+    # ready-dish refresh runs before this.
+    transaction.on_commit(lambda: publish_pantry_update(user_id))
+
+
+@receiver(post_save, sender=PantryLot)
+def lot_changed(sender, instance, **kwargs):
+    schedule_update(instance.user_id)
+
+
+@receiver(post_delete, sender=PantryLot)
+def lot_deleted(sender, instance, origin=None, **kwargs):
+    if not deleted_with_owner(instance, origin):
+        schedule_update(instance.user_id)
+
+
+@receiver(lots_imported)
+def lots_bulk_imported(sender, user, **kwargs):
+    schedule_update(user.pk)
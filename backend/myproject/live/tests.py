@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import threading
+from unittest import mock
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pantry.models import PantryLot
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.radar import radar
+
+from .checks import check_asgiref
+from .pubsub import RESYNC, LocalBackend, get_broker, user_channel
+from .views import release_request_thread
+
+
+class LocalBackendTests(SimpleTestCase):
+    async def test_fan_out(self):
+        backend = LocalBackend()
+        first = backend.subscribe(['user:1'])
+        second = backend.subscribe(['user:1', 'user:2'])
+        self.assertEqual(backend.publish('user:1', 'a'), 2)
+        self.assertEqual(backend.publish('user:2', 'b'), 1)
+        self.assertEqual(await first.get(1), 'a')
+        self.assertEqual([await second.get(1), await second.get(1)], ['a', 'b'])
+        self.assertIsNone(await first.get(0.01))
+        first.close()
+        second.close()
+        self.assertEqual(backend.subscriber_count(), 0)
+        self.assertEqual(backend.publish('user:1', 'c'), 0)
+
+    async def test_slow_reader_gets_a_resync(self):
+        backend = LocalBackend(queue_size=2)
+        subscription = backend.subscribe(['user:1'])
+        for event in range(3):
+            backend.publish('user:1', event)
+        self.assertEqual(await subscription.get(1), RESYNC)
+        self.assertIsNone(await subscription.get(0.01))
+
+
+class ReleaseRequestThreadTests(SimpleTestCase):
+    # Fails when an asgiref upgrade changes the internals the view relies on.
+    def test_asgiref_internals_are_present(self):
+        self.assertEqual(check_asgiref(None), [])
+
+    def test_request_thread_is_shut_down(self):
+        # A loop of its own, as under an ASGI server: in an async test,
+        # thread-sensitive calls would go back to the test's thread instead.
+        async def request():
+            async with ThreadSensitiveContext():
+                before = await sync_to_async(threading.current_thread)()
+                self.assertIs(await sync_to_async(threading.current_thread)(), before)
+                await release_request_thread()
+                return before, await sync_to_async(threading.current_thread)()
+
+        before, after = asyncio.run(request())
+        self.assertIsNot(after, before)
+        before.join(1)
+        self.assertFalse(before.is_alive())
+
+
+class EventStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('cook', password='pw')
+        cls.milk = Ingredient.objects.create(name='Milk')
+
+    def setUp(self):
+        # The index is process-wide; drop any built from another test's rows.
+        radar.invalidate()
+
+    async def test_stream_sends_state_then_pushed_events(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('live:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+        self.assertTrue((await anext(chunks)).startswith(b'event: radar\n'))
+        self.assertTrue((await anext(chunks)).startswith(b'event: expiry\n'))
+
+        get_broker().publish(
+            user_channel(self.user.pk), {'event': 'radar', 'data': {'ready_to_cook': 5}}
+        )
+        self.assertEqual(
+            await anext(chunks), b'event: radar\ndata: {"ready_to_cook": 5}\n\n'
+        )
+        # A client disconnect cancels the task streaming the response.
+        waiting = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    @override_settings(LIVE_HEARTBEAT_SECONDS=0.01)
+    async def test_stream_resends_state_on_a_new_day_or_catalog(self):
+        await PantryLot.objects.acreate(user=self.user, ingredient=self.milk)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('live:events'))
+        chunks = aiter(response.streaming_content)
+        for _ in range(3):
+            await anext(chunks)
+
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+        with mock.patch('live.views.timezone.localdate', return_value=tomorrow):
+            self.assertEqual(await anext(chunks), b': heartbeat\n\n')
+            self.assertEqual(
+                await anext(chunks), f'event: date\ndata: {{"today": "{tomorrow}"}}\n\n'.encode()
+            )
+            self.assertEqual(await anext(chunks), b'event: radar\ndata: {"ready_to_cook": 0}\n\n')
+            self.assertTrue((await anext(chunks)).startswith(b'event: expiry\n'))
+
+            # A catalog write, in this worker or another, bumps the version.
+            latte = await Recipe.objects.acreate(title='Iced latte')
+            await RecipeIngredient.objects.acreate(recipe=latte, ingredient=self.milk)
+            self.assertEqual(await anext(chunks), b': heartbeat\n\n')
+            self.assertEqual(await anext(chunks), b'event: radar\ndata: {"ready_to_cook": 1}\n\n')
+            self.assertTrue((await anext(chunks)).startswith(b'event: expiry\n'))
+
+        waiting = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+    def test_pantry_changes_are_published_after_commit(self):
+        with mock.patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                PantryLot.objects.create(
+                    user=self.user, ingredient=self.milk,
+                    expires_on=timezone.localdate() + datetime.timedelta(days=1),
+                )
+        events = {call.args[1]['event']: call.args[1]['data'] for call in publish.call_args_list}
+        self.assertEqual(publish.call_args.args[0], user_channel(self.user.pk))
+        self.assertEqual(events['expiry']['expiring_soon'], 1)
+        self.assertEqual(events['radar'], {'ready_to_cook': 0})
+
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(reverse('live:events')).status_code, 401)
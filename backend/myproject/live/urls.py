@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'live'
+
+urlpatterns = [
+    path('events/', views.events_view, name='events'),
+]
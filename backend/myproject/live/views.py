@@ -0,0 +1,88 @@
+import json
+
+from asgiref.sync import SyncToAsync, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from myproject.api import api_login_required
+from recipes.radar import acatalog_version
+
+from .events import initial_events, refreshed_events
+from .pubsub import get_broker, user_channel
+
+
+async def release_request_thread():
+    """
+    Give back the thread and database connection held for this request.
+
+    Django's ASGI handler runs sync middleware and async ORM calls in a
+    thread kept for the whole request, and for a stream that is the whole
+    connection. Close the thread's database connection and shut the thread
+    down; any later sync call gets a fresh one that the handler cleans up.
+
+    asgiref has no public API for this; ``live.checks`` warns when the
+    internals used here are missing and the stream then keeps its thread.
+    """
+    executors = getattr(SyncToAsync, 'context_to_thread_executor', None)
+    context_var = getattr(SyncToAsync, 'thread_sensitive_context', None)
+    if executors is None or context_var is None:
+        return
+    context = context_var.get(None)
+    if context not in executors:
+        return
+    await sync_to_async(connections.close_all)()
+    executors.pop(context).shutdown(wait=False)
+
+
+def format_event(event):
+    return f'event: {event["event"]}\ndata: {json.dumps(event["data"])}\n\n'
+
+
+async def event_stream(user_id):
+    """
+    Server-Sent Events for one open tab: current state first, then pushed
+    changes, with comment heartbeats so proxies keep the connection open.
+    Changes no pantry write announces are checked for on every wakeup: a
+    new day (a "date" event, then the state again) or a new catalog version
+    (the state again, with a fresh ready-to-cook count).
+
+    Waiting costs a suspended coroutine and a small queue, not a thread.
+    """
+    subscription = get_broker().subscribe([user_channel(user_id)])
+    try:
+        yield f'retry: {settings.LIVE_RETRY_MILLISECONDS}\n\n'
+        today, catalog = timezone.localdate(), await acatalog_version()
+        for event in await initial_events(user_id):
+            yield format_event(event)
+        await release_request_thread()
+        while True:
+            event = await subscription.get(timeout=settings.LIVE_HEARTBEAT_SECONDS)
+            yield ': heartbeat\n\n' if event is None else format_event(event)
+            now, version = timezone.localdate(), await acatalog_version()
+            if (now, version) != (today, catalog):
+                events = await refreshed_events(user_id, now if now != today else None)
+                today, catalog = now, version
+                for event in events:
+                    yield format_event(event)
+                await release_request_thread()
+    finally:
+        subscription.close()
+
+
+@require_GET
+@api_login_required
+async def events_view(request):
+    """
+    Live cooking-radar and expiry updates as ``text/event-stream``.
+
+    Must be served through ASGI (``myproject.asgi``); under WSGI Django would
+    try to buffer the endless stream.
+    """
+    return StreamingHttpResponse(
+        event_stream(request.user.pk),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
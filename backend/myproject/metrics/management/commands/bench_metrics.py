@@ -0,0 +1,126 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from bench.datagen import Generator, Sizes
+from bench.drivers import WSGIDriver
+from bench.runner import Runner, parse_mix, percentile, throwaway_database
+from metrics.middleware import InstrumentationMiddleware, record_query
+from metrics.registry import registry
+
+MIDDLEWARE = 'metrics.middleware.InstrumentationMiddleware'
+
+
+def handler(instrumented):
+    middleware = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+    if instrumented:
+        middleware.insert(0, MIDDLEWARE)
+    # The handler reads MIDDLEWARE once, when it is built.
+    with override_settings(MIDDLEWARE=middleware):
+        return WSGIHandler()
+
+
+def middleware_cost(queries, repeat=20_000):
+    """
+    Seconds the middleware adds to a request running ``queries`` queries,
+    timed around a no-op view and no-op statements so nothing else varies.
+    """
+    request = RequestFactory().get('/')
+    response = HttpResponse()
+    sql = 'SELECT "x" FROM "y" WHERE "id" = %s'
+
+    def execute(sql, params, many, context):
+        return None
+
+    def view(request):
+        for _ in range(queries):
+            execute(sql, (1,), False, None)
+        return response
+
+    def recorded_view(request):
+        for _ in range(queries):
+            record_query(execute, sql, (1,), False, None)
+        return response
+
+    instrumented = InstrumentationMiddleware(recorded_view)
+    timings = []
+    for call in (view, instrumented):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            call(request)
+        timings.append(time.perf_counter() - started)
+    registry.clear()
+    return (timings[1] - timings[0]) / repeat
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the overhead of the instrumentation middleware: time its hot '
+        'path directly, then replay the same seeded API workload through WSGI '
+        'handlers with and without it, in alternating rounds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--budget', type=float, default=0.02,
+            help='Fail if the overhead exceeds this fraction (default 0.02).',
+        )
+
+    def handle(self, *args, **options):
+        mix = parse_mix('search=45,pantry=30,radar=25')
+        with override_settings(ALLOWED_HOSTS=['testserver']), throwaway_database():
+            Generator(Sizes(users=50, recipes=5_000, ingredients=1_000), options['seed']).run()
+            runners = {
+                label: Runner(WSGIDriver(handler(instrumented)), ['user0', 'user1'], mix, options['seed'])
+                for label, instrumented in (('plain', False), ('instrumented', True))
+            }
+            sessions = {label: runner.login() for label, runner in runners.items()}
+            plan = runners['plain'].plan(options['requests'])
+            for label, runner in runners.items():
+                runner.replay(sessions[label], runner.plan(100, 'warmup'))
+
+            rounds = {label: [] for label in runners}
+            latencies = {label: [] for label in runners}
+            for number in range(options['rounds']):
+                # Alternate the order so drift (caches, turbo) hits both sides.
+                order = list(runners) if number % 2 == 0 else list(reversed(runners))
+                for label in order:
+                    samples, wall = runners[label].replay(sessions[label], plan)
+                    rounds[label].append(wall)
+                    latencies[label].extend(row[0] for rows in samples.values() for row in rows)
+
+        for label in runners:
+            self.stdout.write(
+                f'{label:>12}: median round {statistics.median(rounds[label]):.3f}s '
+                f'({options["requests"] / statistics.median(rounds[label]):.1f} req/s), '
+                f'p50 {percentile(latencies[label], 50) * 1e3:.2f}ms, '
+                f'p99 {percentile(latencies[label], 99) * 1e3:.2f}ms'
+            )
+        plain = statistics.median(rounds['plain'])
+        overhead = statistics.median(rounds['instrumented']) / plain - 1
+        self.stdout.write(f'end to end: {overhead:+.2%} median round time')
+
+        # The end-to-end difference is smaller than the noise, so the budget
+        # is checked against the directly timed cost of the middleware.
+        median_request = percentile(latencies['plain'], 50)
+        queries = round(statistics.mean(
+            row[1] for rows in samples.values() for row in rows
+        ))
+        cost = middleware_cost(queries)
+        share = cost / median_request
+        self.stdout.write(
+            f'hot path: {cost * 1e6:.1f}us per request with {queries} queries, '
+            f'{share:.2%} of the median request ({median_request * 1e3:.2f}ms)'
+        )
+        if share > options['budget']:
+            raise CommandError(
+                f'instrumentation overhead {share:.2%} exceeds the {options["budget"]:.0%} budget'
+            )
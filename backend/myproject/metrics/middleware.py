@@ -0,0 +1,199 @@
+"""
+Per-request instrumentation: wall time, SQL time and query counts by view,
+repeated-query (N+1) detection, ``Server-Timing`` headers and an optional
+sampling profiler. See ``metrics.registry`` for the exported histograms.
+"""
+
+import cProfile
+import heapq
+import logging
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .registry import DB_DURATION, DUPLICATE_QUERIES, QUERIES, REQUEST_DURATION, REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Stats of the request being handled. Context variables follow the request
+# into sync_to_async threads, so queries are attributed under ASGI too.
+current_request = ContextVar('current_request', default=None)
+
+IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+# Anything else is counted as "other", so clients cannot mint label values.
+KNOWN_METHODS = frozenset(['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
+
+
+def view_name(request):
+    match = request.resolver_match
+    return match.view_name if match else '<unresolved>'
+
+
+class RequestStats:
+    __slots__ = ('db_time', 'queries')
+
+    def __init__(self):
+        self.db_time = 0.0
+        # SQL text -> executions. Django's SQL carries placeholders, not
+        # values, so the text already groups queries by shape.
+        self.queries = {}
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def repeated(self, threshold):
+        """``(fingerprint, count)`` of query shapes run ``threshold`` times or more."""
+        shapes = {}
+        for sql, count in self.queries.items():
+            fingerprint = IN_LIST.sub('(%s, ...)', sql)
+            shapes[fingerprint] = shapes.get(fingerprint, 0) + count
+        return [(sql, count) for sql, count in shapes.items() if count >= threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries[sql] = stats.queries.get(sql, 0) + 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver, connected in ``MetricsConfig.ready()``."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class SlowestProfiles:
+    """
+    Keeps cProfile dumps of the slowest sampled requests on disk, evicting
+    the fastest once ``keep`` files exist. Read them with ``python -m pstats``
+    or snakeviz.
+    """
+
+    def __init__(self, directory, keep):
+        self.directory = Path(directory)
+        self.keep = keep
+        self.heap = []
+        self.lock = threading.Lock()
+        # cProfile cannot run two profilers at once (3.12+ refuses outright).
+        self.running = threading.Lock()
+
+    def start(self):
+        if not self.running.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler, duration, view_name):
+        profiler.disable()
+        self.running.release()
+        with self.lock:
+            if len(self.heap) >= self.keep and duration <= self.heap[0][0]:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = re.sub(r'[^\w.-]+', '_', view_name)
+            path = self.directory / f'{duration * 1e3:09.1f}ms-{name}-{time.time_ns()}.prof'
+            profiler.dump_stats(path)
+            heapq.heappush(self.heap, (duration, str(path)))
+            if len(self.heap) > self.keep:
+                Path(heapq.heappop(self.heap)[1]).unlink(missing_ok=True)
+
+
+class InstrumentationMiddleware:
+    """
+    Put it first in ``MIDDLEWARE`` so the timings cover the whole stack.
+
+    Works for sync and async views without adapting either: the per-request
+    state lives in a context variable and SQL is timed by an execute wrapper
+    installed on every database connection as it opens.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.server_timing = settings.METRICS_SERVER_TIMING
+        self.duplicate_threshold = settings.METRICS_DUPLICATE_QUERY_THRESHOLD
+        self.sample_rate = settings.METRICS_PROFILE_SAMPLE_RATE
+        self.profiles = SlowestProfiles(settings.METRICS_PROFILE_DIR, settings.METRICS_PROFILE_KEEP)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token, profiler = self.start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - started
+            self.stop(request, token, profiler, duration)
+        self.finish(request, response, stats, duration)
+        return response
+
+    async def __acall__(self, request):
+        stats, token, profiler = self.start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration = time.perf_counter() - started
+            self.stop(request, token, profiler, duration)
+        self.finish(request, response, stats, duration)
+        return response
+
+    def start(self):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        profiler = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            # Under ASGI only the event loop thread is profiled; work done in
+            # sync_to_async threads shows up as time spent awaiting.
+            profiler = self.profiles.start()
+        return stats, token, profiler
+
+    def stop(self, request, token, profiler, duration):
+        current_request.reset(token)
+        if profiler is not None:
+            self.profiles.stop(profiler, duration, view_name(request))
+
+    def finish(self, request, response, stats, duration):
+        name = view_name(request)
+        method = request.method if request.method in KNOWN_METHODS else 'other'
+        labels = (name, method)
+        query_count = stats.query_count
+
+        REQUESTS.inc((name, method, str(response.status_code)))
+        REQUEST_DURATION.observe(labels, duration)
+        DB_DURATION.observe(labels, stats.db_time)
+        QUERIES.observe(labels, query_count)
+        if query_count >= self.duplicate_threshold:
+            repeated = stats.repeated(self.duplicate_threshold)
+            if repeated:
+                DUPLICATE_QUERIES.inc((name,))
+                for sql, count in repeated:
+                    logger.warning(
+                        'Possible N+1 in %s: %d queries like %s', name, count, sql[:300]
+                    )
+
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'app;dur={duration * 1e3:.1f}, '
+                f'db;dur={stats.db_time * 1e3:.1f};desc="{query_count} queries"'
+            )
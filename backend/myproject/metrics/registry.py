@@ -0,0 +1,165 @@
+"""
+Minimal in-process metrics in the Prometheus text exposition format.
+
+Each metric keeps plain per-label-set counters behind one lock; observing a
+value is a bisect and a few additions, and the cumulative bucket counts
+Prometheus expects are only computed when the endpoint is scraped. Every
+worker process keeps its own figures, so scrape each worker (or sum them
+in the query).
+"""
+
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return repr(round(value, 9)) if value != int(value) else f'{value:.1f}'
+    return str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {escape(self.documentation)}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        with self.lock:
+            series = {labels: self.copy(data) for labels, data in self.series.items()}
+        for labels, data in sorted(series.items()):
+            lines.extend(self.samples(labels, data))
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self.series.get(labels, 0)
+
+    def copy(self, data):
+        return data
+
+    def samples(self, labels, value):
+        yield f'{self.name}_total{format_labels(self.labelnames, labels)} {format_value(value)}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            data = self.series.get(labels)
+            if data is None:
+                # Per-bucket counts (the last one is +Inf), sum.
+                data = self.series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            data[0][index] += 1
+            data[1] += value
+
+    def count(self, labels=()):
+        data = self.series.get(labels)
+        return sum(data[0]) if data else 0
+
+    def copy(self, data):
+        return list(data[0]), data[1]
+
+    def samples(self, labels, data):
+        counts, total = data
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += count
+            le = bound if bound == '+Inf' else format_value(float(bound))
+            yield (
+                f'{self.name}_bucket'
+                f'{format_labels(self.labelnames, labels, [("le", le)])} {cumulative}'
+            )
+        yield f'{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}'
+        yield f'{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        return '\n'.join(line for metric in self.metrics for line in metric.render()) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'pantrypilot_http_requests', 'Requests handled, by view, method and status.',
+    ('view', 'method', 'status'),
+)
+REQUEST_DURATION = registry.histogram(
+    'pantrypilot_http_request_duration_seconds',
+    'Wall time from the first middleware until the response is returned.',
+    ('view', 'method'),
+)
+DB_DURATION = registry.histogram(
+    'pantrypilot_http_request_db_duration_seconds',
+    'Time spent executing SQL during a request.',
+    ('view', 'method'),
+)
+QUERIES = registry.histogram(
+    'pantrypilot_http_request_queries', 'SQL statements executed per request.',
+    ('view', 'method'), buckets=QUERY_BUCKETS,
+)
+DUPLICATE_QUERIES = registry.counter(
+    'pantrypilot_http_duplicate_queries',
+    'Requests that repeated one query shape at least METRICS_DUPLICATE_QUERY_THRESHOLD '
+    'times (likely N+1), by view.',
+    ('view',),
+)
@@ -0,0 +1,116 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path, reverse
+
+from recipes.models import Ingredient
+
+from .registry import DUPLICATE_QUERIES, QUERIES, REQUEST_DURATION, Registry, registry
+
+
+def ingredients_one_by_one(request):
+    ids = Ingredient.objects.values_list('pk', flat=True)
+    return JsonResponse({'names': [Ingredient.objects.get(pk=pk).name for pk in ids]})
+
+
+async def ingredient_count(request):
+    return JsonResponse({'count': await Ingredient.objects.acount()})
+
+
+urlpatterns = [
+    path('one-by-one/', ingredients_one_by_one, name='one_by_one'),
+    path('count/', ingredient_count, name='count'),
+]
+
+
+class RegistryTests(SimpleTestCase):
+    def test_text_format(self):
+        metrics = Registry()
+        latency = metrics.histogram('latency_seconds', 'Latency.', ('view',), buckets=(0.1, 1))
+        hits = metrics.counter('hits', 'Hits.', ('path',))
+        latency.observe(('a',), 0.05)
+        latency.observe(('a',), 0.5)
+        latency.observe(('a',), 3)
+        hits.inc(('say "hi"\n',))
+        self.assertEqual(metrics.render().splitlines(), [
+            '# HELP latency_seconds Latency.',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{view="a",le="0.1"} 1',
+            'latency_seconds_bucket{view="a",le="1.0"} 2',
+            'latency_seconds_bucket{view="a",le="+Inf"} 3',
+            'latency_seconds_sum{view="a"} 3.55',
+            'latency_seconds_count{view="a"} 3',
+            '# HELP hits Hits.',
+            '# TYPE hits counter',
+            r'hits_total{path="say \"hi\"\n"} 1',
+        ])
+
+
+@override_settings(ROOT_URLCONF='metrics.tests', METRICS_DUPLICATE_QUERY_THRESHOLD=5)
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(Ingredient(name=f'Item {n}') for n in range(6))
+
+    def setUp(self):
+        registry.clear()
+
+    def test_counts_queries_and_sends_server_timing(self):
+        with self.assertLogs('metrics.middleware', 'WARNING') as logs:
+            response = self.client.get('/one-by-one/')
+        self.assertRegex(
+            response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="7 queries"$'
+        )
+        labels = ('one_by_one', 'GET')
+        self.assertEqual(REQUEST_DURATION.count(labels), 1)
+        self.assertEqual(QUERIES.series[labels][1], 7)
+        self.assertEqual(DUPLICATE_QUERIES.value(('one_by_one',)), 1)
+        self.assertIn('Possible N+1 in one_by_one: 6 queries like SELECT', logs.output[0])
+
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get('/count/')
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertEqual(DUPLICATE_QUERIES.value(('count',)), 0)
+
+    def test_sampled_requests_keep_slowest_profiles(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(
+            METRICS_PROFILE_SAMPLE_RATE=1.0, METRICS_PROFILE_DIR=directory,
+            METRICS_PROFILE_KEEP=1,
+        ):
+            for _ in range(3):
+                self.client.get('/count/')
+            self.assertEqual(len(list(Path(directory).glob('*-count-*.prof'))), 1)
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(DEBUG=True)
+    def test_exposes_view_metrics(self):
+        user = get_user_model().objects.create_user('cook')
+        self.client.force_login(user)
+        self.client.get(reverse('pantry:lots'))
+        response = self.client.get(reverse('metrics:prometheus'))
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn(
+            'pantrypilot_http_requests_total{view="pantry:lots",method="GET",status="200"}',
+            response.content.decode(),
+        )
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token(self):
+        url = reverse('metrics:prometheus')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        response = self.client.get(url, headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        for header in ('Bearer é', 'Bearer s3cret é', 'Basic'):
+            with self.subTest(header):
+                response = self.client.get(url, headers={'Authorization': header})
+                self.assertEqual(response.status_code, 401)
+
+    def test_closed_without_token_unless_debugging(self):
+        url = reverse('metrics:prometheus')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,31 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from .registry import registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Metrics of this worker process in the Prometheus text format. Scrapers
+    must send ``METRICS_TOKEN`` as a bearer token; without one the endpoint
+    is only served when ``DEBUG`` is on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(
+                'Set METRICS_TOKEN to expose metrics.\n', status=404,
+                content_type='text/plain',
+            )
+    elif not hmac.compare_digest(
+        # Bytes: compare_digest() rejects str with non-ASCII characters.
+        request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()
+    ):
+        return HttpResponse('Unauthorized.\n', status=401, content_type='text/plain')
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,67 @@
+"""
+Cache helpers shared by the project's apps.
+
+Cached rows are stored under a generation key: ``versioned(key)`` appends
+the current generation of ``key`` and ``invalidate(key)`` bumps it. A reader
+that loaded a row before a write and stores it after the invalidation then
+writes under a generation nobody asks for any more, so the old row cannot
+come back the way it could after a plain ``cache.delete()``.
+
+Generations never expire. If the cache loses one it restarts from the
+current time rather than from 1, so it never repeats a generation an
+earlier entry was stored under.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _generation_key(key):
+    return f'{key}:generation'
+
+
+def generation(key):
+    """The current generation of ``key``, started afresh if the cache lost it."""
+    name = _generation_key(key)
+    value = cache.get(name)
+    if value is None:
+        cache.add(name, time.time_ns(), None)
+        value = cache.get(name)
+    return value
+
+
+async def ageneration(key):
+    name = _generation_key(key)
+    value = await cache.aget(name)
+    if value is None:
+        await cache.aadd(name, time.time_ns(), None)
+        value = await cache.aget(name)
+    return value
+
+
+def bump(key):
+    """Move ``key`` to a new generation."""
+    name = _generation_key(key)
+    try:
+        cache.incr(name)
+    except ValueError:
+        cache.add(name, time.time_ns(), None)
+
+
+def versioned(key):
+    """The cache key to read and write the current entry for ``key`` under."""
+    return f'{key}:{generation(key)}'
+
+
+async def aversioned(key):
+    return f'{key}:{await ageneration(key)}'
+
+
+def invalidate(key):
+    """Drop the entry for ``key`` now and again once the transaction commits."""
+    bump(key)
+    # A reader may cache the old row under the new generation before the
+    # writer commits.
+    transaction.on_commit(lambda: bump(key))
@@ -37,9 +37,17 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'recipes',
+    'pantry',
+    'stats',
+    'live',
+    'accounts',
+    'bench',
+    'metrics',
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,6 +88,18 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory cache; use a shared backend (Redis, Memcached) when
+# running several workers, or cache invalidation only reaches one of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -99,6 +119,21 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Sessions and authentication
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/#using-cookie-based-sessions
+# Sessions are signed cookies and the user is loaded through the cache
+# (accounts.backends), so a warm authenticated request runs no query. A
+# signed cookie stays valid until it expires even after logout; changing
+# the password ends all of the user's sessions.
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+# "Keep me signed in for 14 days"; other logins end with the browser session.
+SESSION_COOKIE_AGE = 14 * 24 * 60 * 60
+
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -120,3 +155,91 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Cooking radar: number of per-user pantry matchers kept warm in each process.
+
+RADAR_MATCHER_CACHE_SIZE = 1024
+
+# Tags reported with per-query counts by the recipe search API.
+
+RECIPE_SEARCH_FACETS = ['Vegetarian', 'Vegan', 'High-protein', 'Sheet-pan', 'Comfort']
+
+# Pantry lots expiring within this many days are "urgent", then "warning".
+
+PANTRY_URGENT_DAYS = 2
+
+PANTRY_WARNING_DAYS = 7
+
+# Longest window the "expiring" endpoint accepts for ?days=N.
+
+PANTRY_MAX_EXPIRING_DAYS = 366
+
+# Rows written per transaction by the streaming pantry import.
+
+PANTRY_IMPORT_BATCH_SIZE = 5000
+
+# Dashboard quick stats: the "expiring soon" window and how long a cached
+# snapshot may live (writes invalidate it explicitly).
+
+STATS_EXPIRING_DAYS = 3
+
+STATS_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Live updates (Server-Sent Events). The pub/sub backend fans events out to
+# open streams; LocalBackend only reaches streams held by the same process.
+
+LIVE_PUBSUB_BACKEND = {
+    'BACKEND': 'live.pubsub.LocalBackend',
+    'OPTIONS': {'queue_size': 100},
+}
+
+# Seconds between heartbeats on an idle stream; also how soon a stream
+# notices a new day or catalog version.
+
+LIVE_HEARTBEAT_SECONDS = 15
+
+LIVE_RETRY_MILLISECONDS = 5000
+
+# Request instrumentation (metrics.middleware). Timings are exported per
+# view at /metrics/ and sent to browsers as Server-Timing headers; requests
+# repeating one query shape this many times are logged as likely N+1.
+
+METRICS_SERVER_TIMING = True
+
+METRICS_DUPLICATE_QUERY_THRESHOLD = 10
+
+# Bearer token required to scrape /metrics/. Without one the endpoint is
+# only served when DEBUG is on.
+
+METRICS_TOKEN = None
+
+# Fraction of requests run under cProfile (0 disables it). Dumps of the
+# slowest sampled requests are kept in METRICS_PROFILE_DIR.
+
+METRICS_PROFILE_SAMPLE_RATE = 0.0
+
+METRICS_PROFILE_DIR = BASE_DIR / 'profiles'
+
+METRICS_PROFILE_KEEP = 20
+
+# Meal planner (recipes.planner). Solves run in a pool of PLANNER_WORKERS
+# processes (0 solves in a thread of the web process instead) and return
+# the best plan found within PLANNER_TIME_BUDGET seconds. Only the
+# PLANNER_MAX_CANDIDATES most promising recipes are searched.
+
+PLANNER_WORKERS = 1
+
+PLANNER_TIME_BUDGET = 0.5
+
+PLANNER_MAX_CANDIDATES = 500
+
+PLANNER_MAX_DAYS = 14
+
+PLANNER_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Seconds a signed-in user's row may be served from the cache; saving or
+# deleting the user drops it earlier, in every worker only if CACHES is
+# shared (checked by "check --deploy").
+
+ACCOUNTS_USER_CACHE_TIMEOUT = 60 * 60
@@ -15,8 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/recipes/', include('recipes.urls')),
+    path('api/pantry/', include('pantry.urls')),
+    path('api/stats/', include('stats.urls')),
+    path('api/live/', include('live.urls')),
+    path('api/accounts/', include('accounts.urls')),
+    path('metrics/', include('metrics.urls')),
 ]
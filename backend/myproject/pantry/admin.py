@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import PantryLot
+
+
+@admin.register(PantryLot)
+class PantryLotAdmin(admin.ModelAdmin):
+    list_display = ['ingredient', 'quantity', 'expires_on', 'user']
+    list_filter = ['expires_on']
+    search_fields = ['ingredient__name', 'user__username']
+    autocomplete_fields = ['ingredient']
+    raw_id_fields = ['user']
@@ -0,0 +1,107 @@
+import io
+import random
+import resource
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.management.base import BaseCommand
+
+from bench.runner import throwaway_database
+from pantry.models import PantryLot
+from pantry.views import import_view
+
+ITEMS = [
+    'Milk', 'Baby spinach', 'Parmesan', 'Chicken thighs', 'Chickpeas', 'Fresh basil',
+    'Gnocchi', 'Eggs', 'Butter', 'Greek yogurt', 'Cheddar', 'Carrots', 'Onions',
+    'Garlic', 'Lemons', 'Limes', 'Rice', 'Pasta', 'Tomatoes', 'Salmon',
+]
+QUANTITIES = ['1L', '500ml', '120g', '1/2 wedge', '4 pcs', '2 cans', '1 bunch', '2 packs']
+
+
+class StreamingBody(io.RawIOBase):
+    """A request body produced on the fly from an iterator of byte strings."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            self.pending = next(self.chunks, None)
+            if self.pending is None:
+                self.pending = b''
+                return 0
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream a synthetic CSV receipt dump through the pantry import view on a '
+        'throwaway on-disk database, reporting throughput and peak RSS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lots', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--checkpoints', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.run(options)
+
+    def lines(self, options, report=None):
+        rng = random.Random(options['seed'])
+        every = max(options['lots'] // options['checkpoints'], 1)
+        yield b'ingredient,quantity,expires_on,notes\n'
+        for number in range(1, options['lots'] + 1):
+            yield (
+                f'{rng.choice(ITEMS)},{rng.choice(QUANTITIES)},'
+                f'2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},\n'
+            ).encode()
+            if report and number % every == 0:
+                report(number)
+
+    def run(self, options):
+        user = get_user_model().objects.create_user('bench')
+        length = sum(len(line) for line in self.lines(options))
+        started = time.perf_counter()
+        baseline = max_rss_mb()
+        self.stdout.write(f'body: {length / 1e6:.1f} MB, baseline RSS {baseline:.1f} MB')
+
+        def report(rows):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'  {rows:>9} rows  {rows / elapsed:>9.0f} rows/s  peak RSS {max_rss_mb():.1f} MB'
+            )
+
+        body = io.BufferedReader(StreamingBody(self.lines(options, report)))
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/api/pantry/import/',
+            'CONTENT_TYPE': 'text/csv',
+            'CONTENT_LENGTH': str(length),
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': body,
+        })
+        request.user = user
+        response = import_view(request)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(response.content.decode()[:200])
+        self.stdout.write(
+            f'imported {PantryLot.objects.count()} lots in {elapsed:.1f}s '
+            f'({options["lots"] / elapsed:.0f} rows/s); '
+            f'peak RSS {max_rss_mb():.1f} MB (+{max_rss_mb() - baseline:.1f} MB)'
+        )
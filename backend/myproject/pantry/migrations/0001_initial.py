@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('recipes', '0002_recipe_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PantryLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.CharField(blank=True, max_length=60)),
+                ('expires_on', models.DateField(blank=True, null=True)),
+                ('notes', models.CharField(blank=True, max_length=200)),
+                ('added_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pantry_lots', to='recipes.ingredient')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pantry_lots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'expires_on'], name='pantry_lot_user_expiry'), models.Index(fields=['user', 'ingredient', 'expires_on', 'added_at'], name='pantry_lot_user_item_fifo')],
+            },
+        ),
+    ]
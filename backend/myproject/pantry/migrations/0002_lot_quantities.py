@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:21
+
+from itertools import islice
+
+from django.db import migrations, models
+
+from recipes.migrations._quantities import normalize_many
+
+
+def normalize_quantities(apps, schema_editor):
+    PantryLot = apps.get_model('pantry', 'PantryLot')
+    rows = (
+        PantryLot.objects.exclude(quantity='').select_related('ingredient')
+        .order_by('pk').iterator(chunk_size=5000)
+    )
+    while batch := list(islice(rows, 5000)):
+        quantities = normalize_many((row.quantity, row.ingredient.name) for row in batch)
+        for row, (amount, dimension, _) in zip(batch, quantities):
+            row.amount, row.dimension = amount, dimension
+        PantryLot.objects.bulk_update(batch, ['amount', 'dimension'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pantry', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pantrylot',
+            name='amount',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='pantrylot',
+            name='dimension',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Volume'), (2, 'Mass'), (3, 'Count')], editable=False, null=True),
+        ),
+        migrations.RunPython(normalize_quantities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:57
+
+from itertools import islice
+
+from django.db import migrations, models
+
+from recipes.migrations._quantities import normalize_many
+
+
+def normalize_quantities(apps, schema_editor):
+    # Re-read every quantity: package units and "1,000"-style numbers
+    # are parsed differently now, not only the new column.
+    PantryLot = apps.get_model('pantry', 'PantryLot')
+    rows = (
+        PantryLot.objects.exclude(quantity='').select_related('ingredient')
+        .order_by('pk').iterator(chunk_size=5000)
+    )
+    while batch := list(islice(rows, 5000)):
+        quantities = normalize_many((row.quantity, row.ingredient.name) for row in batch)
+        for row, (amount, dimension, unit) in zip(batch, quantities):
+            row.amount, row.dimension, row.unit = amount, dimension, unit
+        PantryLot.objects.bulk_update(batch, ['amount', 'dimension', 'unit'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pantry', '0002_lot_quantities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pantrylot',
+            name='unit',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(normalize_quantities, migrations.RunPython.noop),
+    ]
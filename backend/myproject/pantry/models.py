@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from recipes.models import NormalizedQuantity
+
+
+class PantryLot(NormalizedQuantity):
+    """
+    One purchase of an ingredient. Duplicate items ("Milk 1L" and "Milk
+    500ml") are separate lots, each with its own expiry.
+
+    Freshness status is derived from ``expires_on`` at query time (see
+    ``pantry.services``) rather than stored. ``amount``, ``dimension``
+    and ``unit`` hold ``quantity`` in canonical units.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='pantry_lots'
+    )
+    ingredient = models.ForeignKey(
+        'recipes.Ingredient', on_delete=models.CASCADE, related_name='pantry_lots'
+    )
+    quantity = models.CharField(max_length=60, blank=True)
+    expires_on = models.DateField(null=True, blank=True)
+    notes = models.CharField(max_length=200, blank=True)
+    added_at = models.DateTimeField(default=timezone.now)
+
+    class Meta(NormalizedQuantity.Meta):
+        indexes = [
+            # "What expires in the next N days" is a range scan on this one.
+            models.Index(fields=['user', 'expires_on'], name='pantry_lot_user_expiry'),
+            # Lots of one item in FIFO order.
+            models.Index(
+                fields=['user', 'ingredient', 'expires_on', 'added_at'],
+                name='pantry_lot_user_item_fifo',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.ingredient} {self.quantity}'.strip()
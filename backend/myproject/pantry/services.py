@@ -0,0 +1,268 @@
+"""
+Pantry lot queries, stock totals and the streaming bulk importer.
+
+Status is never stored: ``fresh``/``warning``/``urgent`` comes from comparing
+``expires_on`` with cut-off dates computed for "today", so it is always
+current and costs nothing to keep up to date. Quantities are, the other way
+round, parsed once when a lot is written (see ``recipes.quantities``), so
+totals are sums over the numeric ``amount`` column.
+"""
+
+import csv
+import datetime
+import json
+from dataclasses import dataclass, field
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, CharField, F, Sum, Value, When
+from django.utils import timezone
+
+from recipes.models import Ingredient
+from recipes.quantities import normalize_many, total_in
+
+from .models import PantryLot
+from .signals import lots_imported
+
+FRESH, WARNING, URGENT = 'fresh', 'warning', 'urgent'
+MAX_REPORTED_ERRORS = 20
+
+
+def status_cutoffs(today=None):
+    """Return the last expiry dates that still count as urgent and warning."""
+    today = today or timezone.localdate()
+    return (
+        today + datetime.timedelta(days=settings.PANTRY_URGENT_DAYS),
+        today + datetime.timedelta(days=settings.PANTRY_WARNING_DAYS),
+    )
+
+
+def with_status(lots, today=None):
+    urgent, warning = status_cutoffs(today)
+    return lots.annotate(status=Case(
+        When(expires_on__lte=urgent, then=Value(URGENT)),
+        When(expires_on__lte=warning, then=Value(WARNING)),
+        default=Value(FRESH),
+        output_field=CharField(),
+    ))
+
+
+def fifo_order():
+    """Soonest expiry first, lots without an expiry last, oldest purchase first."""
+    return [F('expires_on').asc(nulls_last=True), 'added_at', 'pk']
+
+
+def lots_for(user, today=None):
+    return with_status(PantryLot.objects.filter(user=user), today).select_related('ingredient')
+
+
+def lots_by_item(user, today=None):
+    """Lots ordered by item name, each item's lots in FIFO order."""
+    return lots_for(user, today).order_by('ingredient__name', 'ingredient_id', *fifo_order())
+
+
+def group_by_item(lots):
+    """Group lots from ``lots_by_item()`` into ``[(ingredient, [lot, ...]), ...]``."""
+    return [
+        (ingredient, list(item_lots))
+        for ingredient, item_lots in groupby(lots, key=lambda lot: lot.ingredient)
+    ]
+
+
+def grouped_lots(user, today=None):
+    return group_by_item(lots_by_item(user, today))
+
+
+def expiring_within(user, days, today=None):
+    """Lots expiring in the next ``days`` days, including already expired ones."""
+    today = today or timezone.localdate()
+    cutoff = today + datetime.timedelta(days=days)
+    lots = lots_for(user, today).filter(expires_on__lte=cutoff)
+    return lots.order_by('expires_on', 'added_at', 'pk')
+
+
+def unexpired_lots(user, today=None):
+    today = today or timezone.localdate()
+    return PantryLot.objects.filter(user=user).exclude(expires_on__lt=today)
+
+
+def pantry_ingredients(user, today=None):
+    """Ids of the ingredients the user holds at least one unexpired lot of."""
+    return unexpired_lots(user, today).values_list('ingredient_id', flat=True).distinct()
+
+
+def pantry_ingredient_ids(user, today=None):
+    return set(pantry_ingredients(user, today))
+
+
+def stock_totals(user, today=None):
+    """
+    ``(ingredient id, name, unit, total amount)`` rows over unexpired
+    lots, summed by the database; lots with unreadable quantities are left
+    out. Fold them with ``collect_stock()``.
+    """
+    return (
+        unexpired_lots(user, today).exclude(amount=None)
+        .values_list('ingredient_id', 'ingredient__name', 'unit')
+        .annotate(total=Sum('amount'))
+        .order_by('ingredient__name', 'ingredient_id', 'unit')
+    )
+
+
+def collect_stock(rows):
+    """``{ingredient id: (name, {unit: amount})}`` from ``stock_totals()`` rows."""
+    stock = {}
+    for ingredient_id, name, unit, total in rows:
+        stock.setdefault(ingredient_id, (name, {}))[1][unit] = total
+    return stock
+
+
+def check_requirements(requirements, stock):
+    """
+    Compare recipe requirements with the stock from ``collect_stock()``.
+
+    Returns one ``(requirement, on hand, enough)`` per requirement, with the
+    amount on hand in the requirement's unit (``None`` if it cannot be
+    expressed in it). A requirement without a readable quantity only needs
+    the item to be in stock.
+    """
+    checked = []
+    for requirement in requirements:
+        name, totals = stock.get(requirement.ingredient_id, ('', {}))
+        if requirement.amount is None:
+            checked.append((requirement, None, requirement.ingredient_id in stock))
+            continue
+        on_hand = total_in(totals, requirement.unit, name)
+        checked.append((requirement, on_hand, (on_hand or 0) >= requirement.amount))
+    return checked
+
+
+# Bulk import --------------------------------------------------------------
+
+class MalformedInput(ValueError):
+    """The rest of an upload cannot be read (e.g. an unterminated CSV quote)."""
+
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+
+def iter_csv(lines):
+    """
+    Yield ``(line number, row dict)`` from CSV text lines with a header row;
+    raise ``MalformedInput`` where the CSV stops making sense.
+    """
+    reader = csv.DictReader(lines)
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as exc:
+        raise MalformedInput(reader.line_num, f'Malformed CSV at line {reader.line_num}: {exc}')
+
+
+def iter_jsonl(lines):
+    """Yield ``(line number, row)`` from JSON Lines; bad lines yield ``None``."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    # Set when the upload could not be read to the end.
+    aborted: bool = False
+
+    def reject(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+
+class IngredientResolver:
+    """Case-insensitive name -> ingredient id lookup, creating unknown items."""
+
+    def __init__(self):
+        self.names = dict(Ingredient.objects.order_by().values_list('id', 'name'))
+        self.ids = {name.lower(): key for key, name in self.names.items()}
+
+    def __call__(self, name):
+        key = name.lower()
+        if key not in self.ids:
+            ingredient = Ingredient.objects.filter(name__iexact=name).first()
+            if ingredient is None:
+                ingredient = Ingredient.objects.create(name=name)
+            self.ids[key] = ingredient.pk
+            self.names[ingredient.pk] = ingredient.name
+        return self.ids[key]
+
+
+def parse_lot(user, row, resolve):
+    """Build an unsaved lot from an import row; raise ``ValueError`` if invalid."""
+    if not isinstance(row, dict):
+        raise ValueError('Not a JSON object.')
+    name = str(row.get('ingredient') or row.get('name') or '').strip()
+    if not name:
+        raise ValueError('Missing ingredient name.')
+    if len(name) > Ingredient._meta.get_field('name').max_length:
+        raise ValueError('Ingredient name is too long.')
+    expires = str(row.get('expires_on') or '').strip()
+    expires_on = datetime.date.fromisoformat(expires) if expires else None
+    return PantryLot(
+        user=user,
+        ingredient_id=resolve(name),
+        quantity=str(row.get('quantity') or '').strip()[:60],
+        expires_on=expires_on,
+        notes=str(row.get('notes') or '').strip()[:200],
+    )
+
+
+def import_lots(user, rows, batch_size=None):
+    """
+    Create lots from ``(line number, row)`` pairs, one transaction per batch.
+
+    ``rows`` is consumed lazily, so memory stays bounded by ``batch_size``
+    whatever the size of the upload. Invalid rows are skipped and reported.
+    If ``rows`` raises ``MalformedInput``, the rows read so far are kept and
+    the import stops with ``aborted`` set and the error reported last.
+    """
+    batch_size = batch_size or settings.PANTRY_IMPORT_BATCH_SIZE
+    resolve = IngredientResolver()
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        # bulk_create() skips save(), which would parse each quantity.
+        quantities = normalize_many(
+            (lot.quantity, resolve.names[lot.ingredient_id]) for lot in batch
+        )
+        for lot, (amount, dimension, unit) in zip(batch, quantities):
+            lot.amount, lot.dimension, lot.unit = amount, dimension, unit
+        with transaction.atomic():
+            PantryLot.objects.bulk_create(batch)
+            lots_imported.send(sender=PantryLot, user=user, lots=list(batch))
+        result.imported += len(batch)
+        batch.clear()
+
+    try:
+        for line, row in rows:
+            try:
+                batch.append(parse_lot(user, row, resolve))
+            except ValueError as exc:
+                result.reject(line, str(exc) or 'Invalid row.')
+                continue
+            if len(batch) >= batch_size:
+                flush()
+    except MalformedInput as exc:
+        result.aborted = True
+        result.errors.append({'line': exc.line, 'error': str(exc)})
+    if batch:
+        flush()
+    return result
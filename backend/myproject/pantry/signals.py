@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.dispatch import Signal
+
+# Sent by the bulk importer inside each batch's transaction, since
+# bulk_create() skips post_save. Arguments: ``user``, ``lots``.
+lots_imported = Signal()
+
+
+def deleted_with_owner(lot, origin):
+    """
+    Whether a lot's ``post_delete`` comes from deleting the user who owns it
+    (``origin`` is the signal's argument). Receivers must not write per-user
+    rows then: the cascade may already have removed them.
+    """
+    user_model = get_user_model()
+    if isinstance(origin, user_model):
+        return origin.pk == lot.user_id
+    return isinstance(origin, QuerySet) and origin.model is user_model
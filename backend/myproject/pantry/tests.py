@@ -0,0 +1,223 @@
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.quantities import Dimension
+from recipes.radar import radar
+
+from . import services
+from .models import PantryLot
+
+
+def days(count):
+    return timezone.localdate() + datetime.timedelta(days=count)
+
+
+class PantryServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('cook', password='pw')
+        cls.milk = Ingredient.objects.create(name='Milk')
+        cls.basil = Ingredient.objects.create(name='Fresh basil')
+        cls.chickpeas = Ingredient.objects.create(name='Chickpeas')
+        PantryLot.objects.create(user=cls.user, ingredient=cls.milk, quantity='500ml', expires_on=days(5))
+        PantryLot.objects.create(user=cls.user, ingredient=cls.milk, quantity='1L', expires_on=days(1))
+        PantryLot.objects.create(user=cls.user, ingredient=cls.basil, quantity='1 bunch', expires_on=days(-1))
+        PantryLot.objects.create(user=cls.user, ingredient=cls.chickpeas, quantity='2 cans', expires_on=days(120))
+        PantryLot.objects.create(user=cls.user, ingredient=cls.chickpeas, quantity='1 can')
+
+    def test_groups_lots_by_item_in_fifo_order(self):
+        groups = services.grouped_lots(self.user)
+        self.assertEqual([item.name for item, _ in groups], ['Chickpeas', 'Fresh basil', 'Milk'])
+        chickpeas, _, milk = (lots for _, lots in groups)
+        self.assertEqual([lot.quantity for lot in milk], ['1L', '500ml'])
+        self.assertEqual([lot.quantity for lot in chickpeas], ['2 cans', '1 can'])
+
+    def test_status_is_derived_from_expiry(self):
+        statuses = {lot.quantity: lot.status for lot in services.lots_for(self.user)}
+        self.assertEqual(statuses, {
+            '1L': 'urgent', '500ml': 'warning', '1 bunch': 'urgent',
+            '2 cans': 'fresh', '1 can': 'fresh',
+        })
+        # Four days on, the 500ml lot expires tomorrow.
+        later = {lot.quantity: lot.status for lot in services.lots_for(self.user, days(4))}
+        self.assertEqual(later['500ml'], 'urgent')
+
+    def test_expiring_within(self):
+        lots = services.expiring_within(self.user, 3)
+        self.assertEqual([lot.quantity for lot in lots], ['1 bunch', '1L'])
+
+    def test_quantities_are_normalized_on_save(self):
+        lot = PantryLot.objects.get(quantity='500ml')
+        self.assertEqual((lot.amount, lot.dimension), (500, Dimension.VOLUME))
+        lot.quantity = '2 x 1L'
+        lot.save(update_fields=['quantity'])
+        lot.refresh_from_db()
+        self.assertEqual(lot.amount, 2000)
+
+    def test_stock_totals(self):
+        stock = services.collect_stock(services.stock_totals(self.user))
+        # Expired basil is left out; 1L + 500ml of milk add up.
+        self.assertEqual(stock, {
+            self.milk.pk: ('Milk', {'ml': 1500}),
+            self.chickpeas.pk: ('Chickpeas', {'g': 1200}),
+        })
+
+    def test_pantry_ingredients_skip_expired_lots(self):
+        self.assertEqual(
+            services.pantry_ingredient_ids(self.user), {self.milk.pk, self.chickpeas.pk}
+        )
+
+
+@override_settings(PANTRY_IMPORT_BATCH_SIZE=2)
+class PantryApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('cook', password='pw')
+        cls.milk = Ingredient.objects.create(name='Milk')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def upload(self, body, content_type):
+        return self.client.post(reverse('pantry:import'), body, content_type=content_type)
+
+    def test_csv_import_in_batches(self):
+        body = (
+            'ingredient,quantity,expires_on,notes\n'
+            'milk,1L,2030-04-04,Open\n'
+            'Milk,500ml,2030-04-08,\n'
+            'Baby spinach,120g,2030-04-06,\n'
+            ',1 kg,,\n'
+            'Parmesan,1/2 wedge,not-a-date,\n'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.upload(body, 'text/csv')
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "pantry_pantrylot"')]
+        self.assertEqual(len(inserts), 2)
+        payload = response.json()
+        self.assertEqual(payload['imported'], 3)
+        self.assertEqual(payload['skipped'], 2)
+        self.assertEqual([error['line'] for error in payload['errors']], [5, 6])
+        self.assertEqual(PantryLot.objects.filter(ingredient=self.milk).count(), 2)
+        self.assertTrue(Ingredient.objects.filter(name='Baby spinach').exists())
+        self.assertFalse(Ingredient.objects.filter(name='Parmesan').exists())
+
+    def test_malformed_csv_stops_the_import(self):
+        body = (
+            'ingredient,quantity\n'
+            'Milk,1L\n'
+            'Eggs,"6 pcs\n'
+            + 'x' * 200_000 + '\n'
+        )
+        response = self.upload(body, 'text/csv')
+        self.assertEqual(response.status_code, 400)
+        payload = response.json()
+        self.assertEqual((payload['imported'], payload['skipped']), (1, 0))
+        self.assertTrue(payload['aborted'])
+        self.assertIn('Malformed CSV at line', payload['errors'][-1]['error'])
+        self.assertEqual(PantryLot.objects.filter(ingredient=self.milk).count(), 1)
+
+    def test_jsonl_import(self):
+        body = '\n'.join([
+            json.dumps({'ingredient': 'Milk', 'quantity': '1L', 'expires_on': '2030-01-01'}),
+            '{broken',
+            '',
+            json.dumps({'name': 'Gnocchi', 'quantity': '2 packs'}),
+        ])
+        payload = self.upload(body, 'application/x-ndjson').json()
+        self.assertEqual((payload['imported'], payload['skipped']), (2, 1))
+        self.assertEqual(payload['errors'][0]['line'], 2)
+
+    def test_unsupported_content_type(self):
+        self.assertEqual(self.upload('{}', 'application/json').status_code, 415)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('pantry:lots')).status_code, 401)
+
+    def test_lot_listing_and_expiring(self):
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, quantity='1L', expires_on=days(1))
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, quantity='2L', expires_on=days(30))
+        items = self.client.get(reverse('pantry:lots')).json()['items']
+        self.assertEqual([lot['status'] for lot in items[0]['lots']], ['urgent', 'fresh'])
+        expiring = self.client.get(reverse('pantry:expiring'), {'days': 3}).json()
+        self.assertEqual([lot['quantity'] for lot in expiring['lots']], ['1L'])
+        for window in ('999999999', '-1', 'soon'):
+            with self.subTest(window):
+                response = self.client.get(reverse('pantry:expiring'), {'days': window})
+                self.assertEqual(response.status_code, 400)
+
+    def test_import_normalizes_quantities(self):
+        self.upload('ingredient,quantity\nMilk,1L\nMilk,250 ml\nMilk,a splash\n', 'text/csv')
+        amounts = PantryLot.objects.order_by('pk').values_list('amount', 'dimension', 'unit')
+        self.assertEqual(list(amounts), [
+            (1000, Dimension.VOLUME, 'ml'), (250, Dimension.VOLUME, 'ml'), (None, None, ''),
+        ])
+
+    def test_stock_and_recipe_check(self):
+        latte = Recipe.objects.create(title='Iced latte')
+        RecipeIngredient.objects.create(recipe=latte, ingredient=self.milk, quantity='2 cups')
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, quantity='250ml', expires_on=days(3))
+        stock = self.client.get(reverse('pantry:stock')).json()
+        self.assertEqual(stock['items'][0]['totals'], [{'amount': 250, 'unit': 'ml'}])
+        url = reverse('pantry:recipe_check', args=[latte.pk])
+        check = self.client.get(url).json()
+        self.assertFalse(check['can_cook'])
+        self.assertEqual(check['requirements'][0]['needed'], {'amount': 480, 'unit': 'ml'})
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, quantity='1L')
+        check = self.client.get(url).json()
+        self.assertTrue(check['can_cook'])
+        self.assertEqual(check['requirements'][0]['on_hand'], {'amount': 1250, 'unit': 'ml'})
+        self.assertEqual(self.client.get(reverse('pantry:recipe_check', args=[0])).status_code, 404)
+
+    def test_package_counts_are_not_pieces(self):
+        garlic = Ingredient.objects.create(name='Garlic')
+        aioli = Recipe.objects.create(title='Aioli')
+        RecipeIngredient.objects.create(recipe=aioli, ingredient=garlic, quantity='1 head')
+        PantryLot.objects.create(user=self.user, ingredient=garlic, quantity='3 cloves')
+        check = self.client.get(reverse('pantry:recipe_check', args=[aioli.pk])).json()
+        self.assertFalse(check['can_cook'])
+        self.assertIsNone(check['requirements'][0]['on_hand'])
+        stock = self.client.get(reverse('pantry:stock')).json()
+        self.assertEqual(stock['items'][0]['totals'], [{'amount': 3, 'unit': 'clove'}])
+
+    def test_radar_uses_pantry_lots(self):
+        radar.invalidate()
+        latte = Recipe.objects.create(title='Iced latte')
+        RecipeIngredient.objects.create(recipe=latte, ingredient=self.milk)
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, expires_on=days(3))
+        dishes = self.client.get(reverse('pantry:radar')).json()['dishes']
+        self.assertEqual([(dish['title'], dish['can_cook']) for dish in dishes], [('Iced latte', True)])
+
+    @override_settings(PLANNER_WORKERS=0)
+    def test_meal_plan_is_cached_until_the_pantry_changes(self):
+        radar.invalidate()
+        basil = Ingredient.objects.create(name='Fresh basil')
+        pesto = Recipe.objects.create(title='Pesto')
+        latte = Recipe.objects.create(title='Iced latte')
+        RecipeIngredient.objects.create(recipe=pesto, ingredient=basil)
+        RecipeIngredient.objects.create(recipe=latte, ingredient=self.milk)
+        PantryLot.objects.create(user=self.user, ingredient=basil, expires_on=days(0))
+        url = reverse('pantry:plan')
+        plan = self.client.get(url, {'days': 1}).json()
+        self.assertEqual([meal['title'] for meal in plan['meals']], ['Pesto'])
+        self.assertEqual(plan['rescued'], ['Fresh basil'])
+        self.assertFalse(plan['cached'])
+        self.assertTrue(self.client.get(url, {'days': 1}).json()['cached'])
+
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, expires_on=days(0))
+        PantryLot.objects.create(user=self.user, ingredient=self.milk, expires_on=days(0))
+        plan = self.client.get(url, {'days': 1}).json()
+        self.assertFalse(plan['cached'])
+        self.assertEqual([meal['title'] for meal in plan['meals']], ['Iced latte'])
+        self.assertEqual(plan['still_expiring'], ['Fresh basil'])
+        self.assertEqual(self.client.get(url, {'days': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'days': 99}).status_code, 400)
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'pantry'
+
+urlpatterns = [
+    path('lots/', views.lots_view, name='lots'),
+    path('expiring/', views.expiring_view, name='expiring'),
+    path('import/', views.import_view, name='import'),
+    path('radar/', views.radar_view, name='radar'),
+    path('stock/', views.stock_view, name='stock'),
+    path('check/<int:recipe_id>/', views.recipe_check_view, name='recipe_check'),
+    path('plan/', views.plan_view, name='plan'),
+]
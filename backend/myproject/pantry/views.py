@@ -0,0 +1,207 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST
+
+from myproject.api import api_login_required
+from recipes import planner
+from recipes.models import Recipe
+from recipes.quantities import describe
+from recipes.radar import adescribe_matches, radar
+from recipes.views import radar_options
+
+from . import services
+
+IMPORT_FORMATS = {
+    'text/csv': services.iter_csv,
+    'application/jsonl': services.iter_jsonl,
+    'application/x-jsonlines': services.iter_jsonl,
+    'application/x-ndjson': services.iter_jsonl,
+}
+
+
+def serialize_lot(lot):
+    return {
+        'id': lot.pk,
+        'ingredient': lot.ingredient.name,
+        'quantity': lot.quantity,
+        'amount': describe(lot.amount, lot.unit),
+        'expires_on': lot.expires_on,
+        'status': lot.status,
+        'notes': lot.notes,
+    }
+
+
+@require_GET
+@api_login_required
+async def lots_view(request):
+    """All lots grouped by item, each group in FIFO (soonest expiry) order."""
+    lots = [lot async for lot in services.lots_by_item(request.user)]
+    return JsonResponse({
+        'items': [
+            {
+                'ingredient_id': ingredient.pk,
+                'ingredient': ingredient.name,
+                'lots': [serialize_lot(lot) for lot in lots],
+            }
+            for ingredient, lots in services.group_by_item(lots)
+        ],
+    })
+
+
+@require_GET
+@api_login_required
+async def expiring_view(request):
+    """Lots expiring within ``?days=N`` (default: the warning window)."""
+    try:
+        days = int(request.GET.get('days', settings.PANTRY_WARNING_DAYS))
+    except ValueError:
+        return JsonResponse({'error': '"days" must be an integer.'}, status=400)
+    if not 0 <= days <= settings.PANTRY_MAX_EXPIRING_DAYS:
+        return JsonResponse(
+            {'error': f'"days" must be between 0 and {settings.PANTRY_MAX_EXPIRING_DAYS}.'},
+            status=400,
+        )
+    lots = services.expiring_within(request.user, days)
+    return JsonResponse({'days': days, 'lots': [serialize_lot(lot) async for lot in lots]})
+
+
+@require_POST
+@api_login_required
+def import_view(request):
+    """
+    Stream a CSV (``text/csv``, with a header row) or JSON Lines
+    (``application/x-ndjson``) receipt dump into pantry lots.
+
+    Rows need ``ingredient`` and may carry ``quantity``, ``expires_on``
+    (YYYY-MM-DD) and ``notes``. The body is read line by line and written
+    in batches; it is never held in memory as a whole.
+
+    An upload that cannot be read to the end (a malformed CSV) is answered
+    with 400 and ``"aborted": true``; the rows before the error are kept
+    and counted.
+
+    This one stays synchronous: it is a long run of blocking reads and
+    transactions, which Django serves from a worker thread under ASGI.
+    """
+    parse_rows = IMPORT_FORMATS.get(request.content_type)
+    if parse_rows is None:
+        return JsonResponse(
+            {'error': f'Unsupported content type; use one of {", ".join(IMPORT_FORMATS)}.'},
+            status=415,
+        )
+    lines = (line.decode('utf-8-sig', errors='replace') for line in request)
+    result = services.import_lots(request.user, parse_rows(lines))
+    return JsonResponse({
+        'imported': result.imported,
+        'skipped': result.skipped,
+        'errors': result.errors,
+        'aborted': result.aborted,
+    }, status=400 if result.aborted else 200)
+
+
+@require_GET
+@api_login_required
+async def radar_view(request):
+    """
+    The cooking radar for the ingredients in the user's unexpired lots;
+    takes the same ``limit``/``max_missing`` options as the recipes radar.
+    """
+    try:
+        limit, max_missing = radar_options(request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    pantry = {key async for key in services.pantry_ingredients(request.user)}
+    index, matches = await sync_to_async(radar.match)(
+        f'user:{request.user.pk}', pantry, limit=limit, max_missing=max_missing
+    )
+    return JsonResponse({'dishes': await adescribe_matches(index, matches)})
+
+
+@require_GET
+@api_login_required
+async def stock_view(request):
+    """Unexpired stock per item, totalled per canonical unit."""
+    stock = services.collect_stock([row async for row in services.stock_totals(request.user)])
+    return JsonResponse({
+        'items': [
+            {
+                'ingredient_id': ingredient_id,
+                'ingredient': name,
+                'totals': [describe(amount, unit) for unit, amount in totals.items()],
+            }
+            for ingredient_id, (name, totals) in stock.items()
+        ],
+    })
+
+
+@require_GET
+@api_login_required
+async def recipe_check_view(request, recipe_id):
+    """Whether the unexpired stock covers each of a recipe's requirements."""
+    recipe = await Recipe.objects.filter(pk=recipe_id).afirst()
+    if recipe is None:
+        return JsonResponse({'error': 'Recipe not found.'}, status=404)
+    requirements = [
+        requirement async for requirement in
+        recipe.requirements.select_related('ingredient').order_by('ingredient__name')
+    ]
+    stock = services.collect_stock([row async for row in services.stock_totals(request.user)])
+    checked = services.check_requirements(requirements, stock)
+    return JsonResponse({
+        'recipe_id': recipe.pk,
+        'can_cook': all(enough for _, _, enough in checked),
+        'requirements': [
+            {
+                'ingredient_id': requirement.ingredient_id,
+                'ingredient': requirement.ingredient.name,
+                'quantity': requirement.quantity,
+                'needed': describe(requirement.amount, requirement.unit),
+                'on_hand': describe(on_hand, requirement.unit),
+                'enough': enough,
+            }
+            for requirement, on_hand, enough in checked
+        ],
+    })
+
+
+@require_GET
+@api_login_required
+async def plan_view(request):
+    """
+    A meal plan for the next ``?days=N`` days (default 5): one recipe a day,
+    chosen to use up the lots expiring soonest while buying the fewest
+    missing items. ``complete`` is false when the time budget cut the
+    search short.
+
+    Plans are cached per user until the unexpired lots, the date or the
+    catalog change; only then is the pantry planned again.
+    """
+    try:
+        days = int(request.GET.get('days', 5))
+    except ValueError:
+        return JsonResponse({'error': '"days" must be an integer.'}, status=400)
+    if not 1 <= days <= settings.PLANNER_MAX_DAYS:
+        return JsonResponse(
+            {'error': f'"days" must be between 1 and {settings.PLANNER_MAX_DAYS}.'}, status=400
+        )
+    today = timezone.localdate()
+    lots = services.unexpired_lots(request.user, today).values_list('ingredient_id', 'expires_on')
+    lots = [lot async for lot in lots]
+    index = await sync_to_async(radar.index)()
+    state = planner.state_hash(lots, days, today, index.version)
+    key = planner.cache_key(request.user.pk)
+    cached = await cache.aget(key)
+    if cached is not None and cached['state'] == state:
+        return JsonResponse({**cached['plan'], 'cached': True})
+
+    problem = await sync_to_async(planner.build_problem)(
+        index, lots, days, today, settings.PLANNER_MAX_CANDIDATES
+    )
+    plan = await planner.asolve(problem)
+    data = await planner.adescribe_plan(index, problem, plan, today)
+    if plan.searched:
+        await cache.aset(key, {'state': state, 'plan': data}, settings.PLANNER_CACHE_TIMEOUT)
+    return JsonResponse({**data, 'cached': False})
@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from .models import Ingredient, Recipe, RecipeIngredient, Tag
+
+
+class RecipeIngredientInline(admin.TabularInline):
+    model = RecipeIngredient
+    autocomplete_fields = ['ingredient']
+    extra = 1
+
+
+@admin.register(Recipe)
+class RecipeAdmin(admin.ModelAdmin):
+    list_display = ['title', 'ready_in_minutes', 'difficulty']
+    list_filter = ['difficulty', 'tags']
+    search_fields = ['title']
+    inlines = [RecipeIngredientInline]
+
+
+@admin.register(Ingredient)
+class IngredientAdmin(admin.ModelAdmin):
+    search_fields = ['name']
+
+
+admin.site.register(Tag)
@@ -0,0 +1,127 @@
+import datetime
+import time
+from dataclasses import replace
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from bench.datagen import Generator, Sizes
+from bench.runner import percentile
+from recipes import planner
+from recipes.radar import RecipeIndex
+
+
+def sizes(value):
+    return [int(size) for size in value.split(',')]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the meal planner on synthetic in-memory catalogs, drawn as '
+        'generate_data draws them: time to the greedy plan and to a finished '
+        'search, by catalog size and lots per pantry.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--catalogs', type=sizes, default=[1_000, 10_000, 50_000])
+        parser.add_argument('--pantries', type=sizes, default=[10, 40, 160])
+        parser.add_argument('--ingredients', type=int, default=2_000)
+        parser.add_argument('--days', type=int, default=5)
+        parser.add_argument('--max-candidates', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--budget', type=float, default=0.5,
+            help='Search time budget in seconds, as PLANNER_TIME_BUDGET.',
+        )
+
+    def handle(self, *args, **options):
+        today = datetime.date(2026, 1, 1)
+
+        def pantry(generator, rng):
+            # Only unexpired lots reach the planner (see pantry.views.plan_view).
+            return [
+                (lot.ingredient_id, lot.expires_on)
+                for lot in generator.pantry(rng, user_id=0)
+                if lot.expires_on is None or lot.expires_on >= today
+            ]
+
+        self.stdout.write(
+            f'{"catalog":>8} {"pantry":>6} {"cands":>5} {"build":>8} {"greedy":>8} '
+            f'{"p50 solve":>10} {"p95 solve":>10} {"done":>5} {"gain":>6}'
+        )
+        largest, slowest = None, 0
+        for catalog in options['catalogs']:
+            # The same recipe and pantry distributions as generate_data,
+            # without the database.
+            generator = Generator(
+                Sizes(recipes=catalog, ingredients=options['ingredients']),
+                options['seed'], today=today,
+            )
+            generator.use_ingredients(
+                {number: f'ingredient {number}' for number in range(options['ingredients'])}
+            )
+            rng = generator.rng('recipes')
+            index = RecipeIndex(
+                (recipe_id, ingredient_id)
+                for recipe_id in range(catalog)
+                for ingredient_id in generator.recipe_ingredients(rng)
+            )
+            for size in options['pantries']:
+                generator.sizes = replace(generator.sizes, lots_per_user=size)
+                rng = generator.rng(f'lots:{size}')
+                builds, greedies, solves, complete, gains = [], [], [], 0, []
+                for _ in range(options['repeat']):
+                    lots = pantry(generator, rng)
+                    started = time.perf_counter()
+                    problem = planner.build_problem(
+                        index, lots, options['days'], today, options['max_candidates']
+                    )
+                    builds.append(time.perf_counter() - started)
+                    started = time.perf_counter()
+                    first = planner.greedy(problem)
+                    greedies.append(time.perf_counter() - started)
+                    started = time.perf_counter()
+                    plan = planner.solve(problem, time.time() + options['budget'])
+                    solves.append(time.perf_counter() - started)
+                    slowest = max(slowest, solves[-1])
+                    complete += plan.complete
+                    gains.append(plan.score - first.score)
+                    largest = problem
+                self.stdout.write(
+                    f'{catalog:>8} {size:>6} {len(problem.recipes):>5} '
+                    f'{percentile(builds, 50) * 1e3:>6.1f}ms '
+                    f'{percentile(greedies, 50) * 1e3:>6.1f}ms '
+                    f'{percentile(solves, 50) * 1e3:>8.1f}ms '
+                    f'{percentile(solves, 95) * 1e3:>8.1f}ms '
+                    f'{complete:>2}/{options["repeat"]:<2} '
+                    f'{sum(gains) / len(gains):>+6.2f}'
+                )
+
+        # What the pool adds per request: spawn-safe pickling of the problem
+        # and a round trip to the worker, measured with a greedy-only solve.
+        with override_settings(PLANNER_WORKERS=1):
+            try:
+                async_to_sync(planner.asolve)(largest, budget=0)
+                rounds = []
+                for _ in range(20):
+                    started = time.perf_counter()
+                    async_to_sync(planner.asolve)(largest, budget=0)
+                    rounds.append(time.perf_counter() - started)
+            finally:
+                planner.shutdown(wait=True)
+        inline = []
+        for _ in range(20):
+            started = time.perf_counter()
+            planner.solve(largest, 0)
+            inline.append(time.perf_counter() - started)
+        overhead = percentile(rounds, 50) - percentile(inline, 50)
+        self.stdout.write(
+            f'pool round trip: p50 {percentile(rounds, 50) * 1e3:.2f}ms vs '
+            f'{percentile(inline, 50) * 1e3:.2f}ms inline ({overhead * 1e3:+.2f}ms)'
+        )
+        if slowest > options['budget'] + planner.POOL_GRACE:
+            raise CommandError(
+                f'a solve took {slowest:.2f}s, well over the {options["budget"]}s budget'
+            )
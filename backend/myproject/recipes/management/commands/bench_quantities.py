@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bench.datagen import PANTRY_STAPLES, zipf_weights
+from recipes import quantities
+
+UNITS = ['ml', 'L', 'g', 'kg', ' cups', ' tbsp', ' tsp', ' pcs', ' cans', ' bunch', ' oz', ' x 400g']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark batch quantity normalization on synthetic import lines: '
+        'cold and warm memo cache, and without memoization.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=200_000)
+        parser.add_argument('--distinct', type=int, default=3_000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--budget', type=float, default=20_000,
+            help='Fail if cold-cache throughput is below this many lines/s.',
+        )
+
+    def spellings(self, rng, count):
+        spellings = set()
+        while len(spellings) < count:
+            number = rng.choice([
+                str(rng.randint(1, 2000)), f'{rng.randint(1, 9)}.{rng.randint(1, 9)}',
+                f'{rng.randint(1, 3)} {rng.randint(1, 3)}/{rng.choice([2, 3, 4])}',
+            ])
+            spellings.add(number + rng.choice(UNITS))
+        return sorted(spellings)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        spellings = self.spellings(rng, options['distinct'])
+        # Receipts repeat a few spellings a lot.
+        texts = rng.choices(spellings, cum_weights=zipf_weights(len(spellings)), k=options['lines'])
+        pairs = [(text, rng.choice(PANTRY_STAPLES)) for text in texts]
+
+        quantities.parse.cache_clear()
+        cold = self.timed(quantities.normalize_many, pairs)
+        info = quantities.parse.cache_info()
+        warm = self.timed(quantities.normalize_many, pairs)
+
+        parse = quantities.parse
+        quantities.parse = parse.__wrapped__
+        try:
+            uncached = self.timed(quantities.normalize_many, pairs)
+        finally:
+            quantities.parse = parse
+
+        lines = options['lines']
+        for label, seconds in (('cold cache', cold), ('warm cache', warm), ('no memo', uncached)):
+            self.stdout.write(
+                f'{label:>10}: {lines / seconds:>10.0f} lines/s '
+                f'({seconds * 1e6 / lines:.2f}us per line)'
+            )
+        self.stdout.write(
+            f'cache: {info.hits} hits, {info.misses} misses '
+            f'({info.hits / (info.hits + info.misses):.1%} hit rate)'
+        )
+        if lines / cold < options['budget']:
+            raise CommandError(
+                f'{lines / cold:.0f} lines/s is below the {options["budget"]:.0f} lines/s budget'
+            )
+
+    def timed(self, func, pairs):
+        started = time.perf_counter()
+        func(pairs)
+        return time.perf_counter() - started
+
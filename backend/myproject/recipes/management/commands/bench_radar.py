@@ -0,0 +1,110 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bench.datagen import Generator, Sizes, zipf_weights
+from bench.runner import percentile, throwaway_database
+from recipes.radar import describe_matches, radar
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the cooking radar request path (cached index, per-user '
+        'matcher, ranking and loading/serializing the dishes) on a generated '
+        'catalog in a throwaway database. Ingredient popularity is Zipf-like, '
+        'as in real recipe data. The budget applies to warm requests: a '
+        'user\'s first request, and every request after a catalog write, '
+        'builds the matcher (or the whole index) and is reported separately.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100_000)
+        parser.add_argument('--ingredients', type=int, default=2_000)
+        parser.add_argument('--pantry', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--budget-ms', type=float, default=50.0,
+            help='Fail if the p99 of a warm radar request exceeds this.',
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        limit = options['limit']
+        with throwaway_database():
+            started = time.perf_counter()
+            Generator(
+                Sizes(users=1, recipes=options['recipes'], ingredients=options['ingredients'],
+                      lots_per_user=0),
+                options['seed'],
+            ).run()
+            self.stdout.write(
+                f'catalog: {options["recipes"]} recipes generated in '
+                f'{time.perf_counter() - started:.1f}s'
+            )
+            radar.invalidate()
+            started = time.perf_counter()
+            index = radar.index()
+            self.stdout.write(
+                f'index rebuild (after any catalog write): {time.perf_counter() - started:.2f}s'
+            )
+
+            # Generated ingredients are in popularity order.
+            ingredients = sorted(index.ingredient_names)
+            weights = zipf_weights(len(ingredients), 0.9)
+
+            def pantry():
+                drawn = set()
+                while len(drawn) < options['pantry']:
+                    drawn.add(rng.choices(ingredients, cum_weights=weights)[0])
+                return drawn
+
+            def request(key, items):
+                started = time.perf_counter()
+                index, matches = radar.match(key, items, limit=limit)
+                matched = time.perf_counter()
+                describe_matches(index, matches)
+                done = time.perf_counter()
+                return matched - started, done - started
+
+            cold = [request(f'bench:cold:{number}', pantry())
+                    for number in range(max(options['requests'] // 25, 5))]
+
+            # Steady state: the user's matcher is cached and each request
+            # carries a one-item pantry change (add or remove) before ranking.
+            items = pantry()
+            request('bench:warm', items)
+            warm = []
+            for _ in range(options['requests']):
+                items = set(items)
+                if rng.random() < 0.5 and items:
+                    items.discard(rng.choice(sorted(items)))
+                else:
+                    items.add(rng.choices(ingredients, cum_weights=weights)[0])
+                warm.append(request('bench:warm', items))
+
+        for label, samples in (('cold request', cold), ('warm request', warm)):
+            totals = [total for _, total in samples]
+            self.stdout.write(
+                f'{label:>12}: n={len(samples)} '
+                f'match p50={percentile([match for match, _ in samples], 50) * 1e3:.2f}ms '
+                f'total mean={statistics.mean(totals) * 1e3:.2f}ms '
+                f'p50={percentile(totals, 50) * 1e3:.2f}ms '
+                f'p95={percentile(totals, 95) * 1e3:.2f}ms '
+                f'p99={percentile(totals, 99) * 1e3:.2f}ms'
+            )
+
+        p99 = percentile([total for _, total in warm], 99) * 1e3
+        cold_p99 = percentile([total for _, total in cold], 99) * 1e3
+        if cold_p99 > options['budget_ms']:
+            self.stdout.write(
+                f'note: cold requests (p99 {cold_p99:.0f}ms) are over the '
+                f'{options["budget_ms"]:.0f}ms budget; only warm requests meet it'
+            )
+        if p99 > options['budget_ms']:
+            raise CommandError(
+                f'warm p99 {p99:.2f}ms exceeds the {options["budget_ms"]:.0f}ms budget'
+            )
@@ -0,0 +1,121 @@
+import random
+import statistics
+import time
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from bench.datagen import SYLLABLES, TAGS, WORDS
+from bench.runner import percentile, throwaway_database
+from recipes.models import Recipe, Tag
+from recipes.search import search_recipes
+
+QUERIES = [
+    ('curry', []), ('chick', []), ('lemon salmon', []), ('roasted sweet potato', []),
+    ('soup', ['Vegan']), ('', ['Comfort']), ('', []), ('tofu crispy', ['Vegan', 'Vegetarian']),
+]
+
+
+def naive_search(query, tags, limit=20):
+    """What the client-side scan turns into as an ORM query."""
+    recipes = Recipe.objects.all()
+    if query:
+        recipes = recipes.filter(Q(title__icontains=query) | Q(summary__icontains=query))
+    facets = dict(
+        recipes.filter(tags__name__in=settings.RECIPE_SEARCH_FACETS)
+        .values_list('tags__name').annotate(count=Count('id')).order_by()
+    )
+    if tags:
+        recipes = recipes.filter(tags__name__in=tags).distinct()
+    return list(recipes.prefetch_related('tags').order_by('id')[:limit]), facets
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare FTS5 recipe search with a naive icontains ORM query on a '
+        'throwaway test database grown to each requested size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000]
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        with throwaway_database(on_disk=False):
+            self.run(options)
+
+    def vocabulary(self, rng):
+        """Recipe words plus a long tail of made-up ones, Zipf-weighted."""
+        tail = {
+            ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+            for _ in range(5_000)
+        }
+        words = WORDS + sorted(tail - set(WORDS))
+        rng.shuffle(words)
+        cum_weights = list(accumulate(1 / (rank + 1) ** 1.07 for rank in range(len(words))))
+        return words, cum_weights
+
+    def grow(self, rng, tags, target, vocabulary):
+        words, cum_weights = vocabulary
+        through = Recipe.tags.through
+        current = Recipe.objects.count()
+        while current < target:
+            batch = min(10_000, target - current)
+            with transaction.atomic():
+                recipes = Recipe.objects.bulk_create([
+                    Recipe(
+                        title=' '.join(
+                            rng.choices(words, cum_weights=cum_weights, k=rng.randint(3, 5))
+                        ).title(),
+                        summary=' '.join(
+                            rng.choices(words, cum_weights=cum_weights, k=rng.randint(8, 14))
+                        ),
+                        ready_in_minutes=rng.randrange(10, 120),
+                    )
+                    for _ in range(batch)
+                ])
+                through.objects.bulk_create([
+                    through(recipe_id=recipe.pk, tag_id=tag.pk)
+                    for recipe in recipes
+                    for tag in rng.sample(tags, rng.randint(0, 3))
+                ])
+            current += batch
+
+    def timed(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        tags = [Tag.objects.create(name=name) for name in TAGS]
+        vocabulary = self.vocabulary(random.Random(options['seed']))
+        for size in sorted(options['sizes']):
+            started = time.perf_counter()
+            self.grow(rng, tags, size, vocabulary)
+            self.stdout.write(f'\n{size} recipes (loaded in {time.perf_counter() - started:.1f}s)')
+            totals = {'fts': [], 'naive': []}
+            for query, filters in QUERIES:
+                fts = self.timed(lambda: search_recipes(query, filters), options['repeat'])
+                naive = self.timed(lambda: naive_search(query, filters), options['repeat'])
+                totals['fts'].extend(fts)
+                totals['naive'].extend(naive)
+                self.stdout.write(
+                    f'  q={query!r:24} tags={",".join(filters) or "-":20} '
+                    f'fts={statistics.median(fts) * 1e3:8.2f}ms '
+                    f'naive={statistics.median(naive) * 1e3:9.2f}ms'
+                )
+            for label, samples in totals.items():
+                self.stdout.write(
+                    f'  {label:>5}: p50={percentile(samples, 50) * 1e3:.2f}ms '
+                    f'p95={percentile(samples, 95) * 1e3:.2f}ms'
+                )
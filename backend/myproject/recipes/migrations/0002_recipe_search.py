@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:39
+
+from django.db import migrations
+
+# External-content FTS5 index over recipe title and summary, kept in sync by
+# triggers so bulk_create() and raw updates are indexed too.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5(
+        title, summary,
+        content='recipes_recipe', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_fts_ai AFTER INSERT ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_fts(rowid, title, summary)
+        VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_fts_ad AFTER DELETE ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_fts_au AFTER UPDATE OF title, summary ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+        INSERT INTO recipes_recipe_fts(rowid, title, summary)
+        VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    "INSERT INTO recipes_recipe_fts(recipes_recipe_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    'DROP TRIGGER IF EXISTS recipes_recipe_fts_au',
+    'DROP TRIGGER IF EXISTS recipes_recipe_fts_ad',
+    'DROP TRIGGER IF EXISTS recipes_recipe_fts_ai',
+    'DROP TABLE IF EXISTS recipes_recipe_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_FTS, reverse_sql=DROP_FTS),
+        # Covering (tag, recipe) index: tag filters and facet counts are
+        # answered from the index alone.
+        migrations.RunSQL(
+            'CREATE INDEX recipes_recipe_tags_tag_recipe '
+            'ON recipes_recipe_tags (tag_id, recipe_id)',
+            reverse_sql='DROP INDEX IF EXISTS recipes_recipe_tags_tag_recipe',
+        ),
+    ]
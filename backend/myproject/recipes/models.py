@@ -0,0 +1,93 @@
+from django.db import models
+
+from .quantities import Dimension, normalize
+
+
+class NormalizedQuantity(models.Model):
+    """
+    Free-text ``quantity`` plus its canonical ``amount``, ``dimension`` and
+    ``unit``, parsed whenever the row is saved (bulk writers must fill them in; see
+    ``recipes.quantities``). Subclasses provide ``quantity`` and
+    ``ingredient``.
+    """
+
+    amount = models.FloatField(null=True, blank=True, editable=False)
+    dimension = models.PositiveSmallIntegerField(
+        choices=Dimension.choices, null=True, blank=True, editable=False
+    )
+    unit = models.CharField(max_length=16, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or 'quantity' in update_fields:
+            self.amount, self.dimension, self.unit = normalize(
+                self.quantity, self.ingredient.name
+            )
+            if update_fields is not None:
+                update_fields = {*update_fields, 'amount', 'dimension', 'unit'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Ingredient(models.Model):
+    name = models.CharField(max_length=120, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=60, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class Recipe(models.Model):
+    class Difficulty(models.TextChoices):
+        EASY = 'Easy'
+        INTERMEDIATE = 'Intermediate'
+        ADVANCED = 'Advanced'
+
+    title = models.CharField(max_length=200)
+    summary = models.TextField(blank=True)
+    ready_in_minutes = models.PositiveIntegerField(default=30)
+    difficulty = models.CharField(
+        max_length=20, choices=Difficulty.choices, default=Difficulty.EASY
+    )
+    tags = models.ManyToManyField(Tag, related_name='recipes', blank=True)
+    ingredients = models.ManyToManyField(
+        Ingredient, through='RecipeIngredient', related_name='recipes'
+    )
+
+    def __str__(self):
+        return self.title
+
+
+class RecipeIngredient(NormalizedQuantity):
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name='requirements'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, related_name='requirements'
+    )
+    quantity = models.CharField(max_length=60, blank=True)
+
+    class Meta(NormalizedQuantity.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'ingredient'], name='unique_recipe_ingredient'
+            ),
+        ]
+        # Inverse lookup used when (re)building the radar index.
+        indexes = [models.Index(fields=['ingredient', 'recipe'])]
+
+    def __str__(self):
+        return f'{self.recipe} needs {self.ingredient}'
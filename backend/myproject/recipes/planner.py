@@ -0,0 +1,433 @@
+"""
+Meal planning: pick a recipe for each of the next few days so the plan uses
+up as many soon-to-expire pantry lots as possible while buying as few
+missing items as possible.
+
+Each pantry item is worth the summed urgency of its lots that are still
+good on the day of the first meal using it, counted once however many
+meals use it; each missing item costs the same once, however many meals
+need it. A plan assigns recipes to days, so an item cooked after its lots
+expire is worth nothing. Maximising worth minus cost is a weighted set
+cover with deadlines, so it is searched rather than solved: a greedy plan
+first, then best-swap local search (a recipe for another, or two recipes
+trading days) from perturbed copies of the best plan until the time
+budget runs out. Whatever is best at the deadline is returned.
+
+``solve()`` only touches the plain data in a ``Problem``, so it runs in a
+process pool (``asolve()``) and never holds up a request thread. Plans are
+cached per user under a hash of the pantry state (see ``state_hash()``).
+"""
+
+import asyncio
+import datetime
+import hashlib
+import heapq
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+# A lot expiring on the plan's last day is worth EXPIRING_WEIGHT, rising
+# linearly to twice that for one expiring today. Other lots still save a
+# purchase, so they are worth a little.
+EXPIRING_WEIGHT = 3.0
+STOCK_WEIGHT = 0.5
+MISSING_COST = 1.0
+# Restarts in a row that may fail to improve the plan before the search
+# counts as finished.
+STALE_RESTARTS = 20
+# How long a request waits on top of the budget before giving up on the
+# pool (workers busy) and planning greedily itself.
+POOL_GRACE = 1.0
+EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Problem:
+    days: int
+    # ``(recipe id, pantry ingredient ids used, missing ingredient ids)``,
+    # most promising first.
+    recipes: tuple
+    # Pantry ingredient id -> worth of using it today.
+    weights: dict
+    # Pantry ingredient id -> days until its soonest lot expires (or None).
+    expires_in: dict
+    # Pantry ingredient id -> worth of using it first on each day of the
+    # plan, leaving out lots expired by then. Defaults to ``weights`` on
+    # every day.
+    worth: dict = None
+
+    def __post_init__(self):
+        if self.worth is None:
+            worth = {key: (weight,) * self.days for key, weight in self.weights.items()}
+            object.__setattr__(self, 'worth', worth)
+
+
+@dataclass(frozen=True)
+class Plan:
+    recipe_ids: tuple
+    score: float
+    # False when the deadline cut the search short.
+    complete: bool
+    # False for the greedy plan a request falls back to when the pool is busy.
+    searched: bool = True
+    restarts: int = 0
+
+
+def lot_weight(expires_in, days):
+    if expires_in is None or expires_in >= days:
+        return STOCK_WEIGHT
+    return EXPIRING_WEIGHT * (1 + (days - max(expires_in, 0)) / days)
+
+
+def build_problem(index, lots, days, today, max_candidates=500):
+    """
+    The planning problem for unexpired ``(ingredient id, expires_on)`` lots
+    against a ``recipes.radar.RecipeIndex``. Only recipes using at least one
+    pantry item are candidates, and only the ``max_candidates`` best on
+    their own are kept.
+    """
+    weights, expires_in, worth = {}, {}, {}
+    for ingredient_id, expires_on in lots:
+        left = None if expires_on is None else (expires_on - today).days
+        weight = lot_weight(left, days)
+        weights[ingredient_id] = weights.get(ingredient_id, 0) + weight
+        # The lot counts for meals on the day it expires, not after.
+        by_day = worth.setdefault(ingredient_id, [0.0] * days)
+        for day in range(days if left is None else min(left + 1, days)):
+            by_day[day] += weight
+        if ingredient_id not in expires_in:
+            expires_in[ingredient_id] = left
+        elif left is not None:
+            soonest = expires_in[ingredient_id]
+            expires_in[ingredient_id] = left if soonest is None else min(left, soonest)
+
+    # Score every recipe on its own in one pass over the postings: each
+    # pantry item it uses adds its weight and is one item less to buy.
+    alone = {}
+    for ingredient_id, weight in weights.items():
+        for recipe_id in index.postings.get(ingredient_id, ()):
+            alone[recipe_id] = alone.get(recipe_id, 0) + weight + MISSING_COST
+    required = index.required
+    best = heapq.nsmallest(
+        max_candidates, alone,
+        key=lambda recipe_id: (MISSING_COST * required[recipe_id] - alone[recipe_id], recipe_id),
+    )
+    recipes = []
+    for recipe_id in best:
+        ingredients = index.recipe_ingredients[recipe_id]
+        used = tuple(key for key in ingredients if key in weights)
+        missing = tuple(key for key in ingredients if key not in weights)
+        recipes.append((recipe_id, used, missing))
+    return Problem(
+        days=days, recipes=tuple(recipes), weights=weights, expires_in=expires_in,
+        worth={key: tuple(by_day) for key, by_day in worth.items()},
+    )
+
+
+class Selection:
+    """
+    Recipes assigned to days, with the days each item is used on, so gains
+    are incremental.
+    """
+
+    def __init__(self, problem):
+        self.used = [row[1] for row in problem.recipes]
+        self.missing = [row[2] for row in problem.recipes]
+        self.worth = problem.worth
+        self.slots = [None] * problem.days
+        self.day = {}
+        self.use_days = {}
+        self.buy_count = {}
+        self.score = 0.0
+
+    @property
+    def chosen(self):
+        return list(self.day)
+
+    def free_day(self):
+        return self.slots.index(None)
+
+    def gain(self, candidate, day):
+        """Score change from cooking ``candidate`` (a position in the problem) on ``day``."""
+        use_days, buy_count, worth = self.use_days, self.buy_count, self.worth
+        value = 0.0
+        for key in self.used[candidate]:
+            days = use_days.get(key)
+            if not days:
+                value += worth[key][day]
+            else:
+                # Only an earlier first use can save more lots.
+                first = min(days)
+                if day < first:
+                    value += worth[key][day] - worth[key][first]
+        for key in self.missing[candidate]:
+            if not buy_count.get(key):
+                value -= MISSING_COST
+        return value
+
+    def add(self, candidate, day):
+        self.score += self.gain(candidate, day)
+        self.slots[day] = candidate
+        self.day[candidate] = day
+        for key in self.used[candidate]:
+            self.use_days.setdefault(key, []).append(day)
+        for key in self.missing[candidate]:
+            self.buy_count[key] = self.buy_count.get(key, 0) + 1
+
+    def remove(self, candidate):
+        day = self.day.pop(candidate)
+        self.slots[day] = None
+        for key in self.used[candidate]:
+            self.use_days[key].remove(day)
+        for key in self.missing[candidate]:
+            self.buy_count[key] -= 1
+        self.score -= self.gain(candidate, day)
+        return day
+
+    def copy(self):
+        other = Selection.__new__(Selection)
+        other.__dict__.update(self.__dict__)
+        other.slots = list(self.slots)
+        other.day = dict(self.day)
+        other.use_days = {key: list(days) for key, days in self.use_days.items()}
+        other.buy_count = dict(self.buy_count)
+        return other
+
+
+def greedy(problem):
+    """Fill the days in order, each with the recipe that adds the most."""
+    selection = Selection(problem)
+    remaining = list(range(len(problem.recipes)))
+    for day in range(min(problem.days, len(remaining))):
+        # Candidates are in promise order, so ties go to the better one alone.
+        best = max(remaining, key=lambda candidate: selection.gain(candidate, day))
+        remaining.remove(best)
+        selection.add(best, day)
+    return selection
+
+
+def improve(selection, count, deadline):
+    """
+    Best-swap local search: for each chosen recipe in turn, swap in the
+    candidate that adds the most on its day, then let any two chosen
+    recipes trade days if that adds. Return False if the deadline stopped
+    it before no swap helped any more.
+    """
+    improved = True
+    while improved:
+        improved = False
+        for candidate in selection.chosen:
+            if time.time() >= deadline:
+                return False
+            day = selection.remove(candidate)
+            chosen = selection.day
+            best, best_gain = candidate, selection.gain(candidate, day) + EPSILON
+            for other in range(count):
+                if other not in chosen and other != candidate:
+                    gain = selection.gain(other, day)
+                    if gain > best_gain:
+                        best, best_gain = other, gain
+            selection.add(best, day)
+            improved = improved or best != candidate
+        improved = reorder(selection, deadline) or improved
+    return True
+
+
+def reorder(selection, deadline):
+    """Swap the days of any two chosen recipes when that adds; True if any did."""
+    improved = False
+    chosen = selection.chosen
+    for position, first in enumerate(chosen):
+        if time.time() >= deadline:
+            break
+        for second in chosen[position + 1:]:
+            before = selection.score
+            first_day, second_day = selection.remove(first), selection.remove(second)
+            selection.add(first, second_day)
+            selection.add(second, first_day)
+            if selection.score > before + EPSILON:
+                improved = True
+            else:
+                selection.remove(first)
+                selection.remove(second)
+                selection.add(first, first_day)
+                selection.add(second, second_day)
+    return improved
+
+
+def schedule(problem, selection):
+    """Recipe ids in day order."""
+    return tuple(
+        problem.recipes[candidate][0] for candidate in selection.slots if candidate is not None
+    )
+
+
+def solve(problem, deadline, seed=0):
+    """
+    Search for the best plan until ``deadline`` (a ``time.time()`` value).
+
+    Anytime: a greedy plan exists after the first pass and the best plan
+    so far is returned when time runs out, with ``complete`` False.
+    """
+    count = len(problem.recipes)
+    best = greedy(problem)
+    if count <= problem.days:
+        complete = improve(best, count, deadline)
+        return Plan(schedule(problem, best), best.score, complete)
+    complete = improve(best, count, deadline)
+    rng = random.Random(seed)
+    restarts = stale = 0
+    while complete and stale < STALE_RESTARTS:
+        if time.time() >= deadline:
+            complete = False
+            break
+        # Kick a few recipes out for random ones and search again from there.
+        current = best.copy()
+        for candidate in rng.sample(current.chosen, max(1, problem.days // 3)):
+            current.remove(candidate)
+        while len(current.day) < problem.days:
+            candidate = rng.randrange(count)
+            if candidate not in current.day:
+                current.add(candidate, current.free_day())
+        finished = improve(current, count, deadline)
+        restarts += 1
+        if current.score > best.score + EPSILON:
+            best, stale = current, 0
+        else:
+            stale += 1
+        complete = finished
+    return Plan(schedule(problem, best), best.score, complete, restarts=restarts)
+
+
+# Running solves ------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """The process-wide solver pool, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Forking a process that holds database connections and threads
+            # is unsafe; spawned workers only import this module.
+            _executor = ProcessPoolExecutor(
+                settings.PLANNER_WORKERS, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def shutdown(wait=False):
+    """
+    Stop the pool, dropping queued solves. Pass ``wait=True`` to join the
+    workers, e.g. before the interpreter exits, so their pipes are not
+    closed while still in use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+async def asolve(problem, budget=None):
+    """
+    Solve in the pool (or a thread, with ``PLANNER_WORKERS = 0``) within
+    ``budget`` seconds. If the pool cannot answer in time, the greedy plan
+    is returned with ``searched`` False.
+    """
+    budget = settings.PLANNER_TIME_BUDGET if budget is None else budget
+    deadline = time.time() + budget
+    if not settings.PLANNER_WORKERS:
+        return await sync_to_async(solve, thread_sensitive=False)(problem, deadline)
+    try:
+        future = asyncio.wrap_future(executor().submit(solve, problem, deadline))
+        return await asyncio.wait_for(future, budget + POOL_GRACE)
+    except BrokenProcessPool:
+        shutdown()
+    except TimeoutError:
+        pass
+    selection = await sync_to_async(greedy, thread_sensitive=False)(problem)
+    return Plan(schedule(problem, selection), selection.score, False, searched=False)
+
+
+# Caching and serialization ------------------------------------------------
+
+def cache_key(user_id):
+    return f'planner:user:{user_id}'
+
+
+def state_hash(lots, days, today, version):
+    """
+    Digest of everything a plan depends on: the unexpired lots (item and
+    expiry only; amounts do not change the plan), the horizon, the date
+    and the catalog version.
+    """
+    digest = hashlib.blake2b(f'{days}:{today}:{version}'.encode(), digest_size=16)
+    lots = sorted(lots, key=lambda lot: (lot[0], lot[1] or datetime.date.max))
+    for ingredient_id, expires_on in lots:
+        digest.update(f'|{ingredient_id}:{expires_on}'.encode())
+    return digest.hexdigest()
+
+
+def rescued(problem, recipe_ids):
+    """
+    Items with a lot expiring within the plan whose first meal (recipe ids
+    in day order) is on or before the day that lot expires.
+    """
+    rows = {row[0]: row for row in problem.recipes}
+    first = {}
+    for day, recipe_id in enumerate(recipe_ids):
+        for key in rows[recipe_id][1]:
+            first.setdefault(key, day)
+    return {
+        key for key, day in first.items()
+        if problem.expires_in[key] is not None and day <= problem.expires_in[key] < problem.days
+    }
+
+
+async def adescribe_plan(index, problem, plan, today):
+    """Serialize a plan for the API, loading recipe rows in one go."""
+    from .models import Recipe
+
+    recipes = await Recipe.objects.ain_bulk(plan.recipe_ids)
+    names = index.ingredient_names
+    rows = {row[0]: row for row in problem.recipes}
+    expiring = {
+        key for key, left in problem.expires_in.items()
+        if left is not None and left < problem.days
+    }
+    saved = rescued(problem, plan.recipe_ids)
+    shopping = set()
+    meals = []
+    for day, recipe_id in enumerate(plan.recipe_ids):
+        recipe = recipes.get(recipe_id)
+        if recipe is None:
+            continue
+        _, uses, missing = rows[recipe_id]
+        shopping.update(missing)
+        meals.append({
+            'date': today + datetime.timedelta(days=day),
+            'recipe_id': recipe.pk,
+            'title': recipe.title,
+            'ready_in_minutes': recipe.ready_in_minutes,
+            'uses': sorted(names.get(key, '') for key in uses),
+            'missing': sorted(names.get(key, '') for key in missing),
+        })
+    return {
+        'days': problem.days,
+        'meals': meals,
+        'shopping_list': sorted(names.get(key, '') for key in shopping),
+        'rescued': sorted(names.get(key, '') for key in saved),
+        'still_expiring': sorted(names.get(key, '') for key in expiring - saved),
+        'score': round(plan.score, 3),
+        'complete': plan.complete,
+    }
@@ -0,0 +1,242 @@
+"""
+Free-text quantities ("1L", "500 ml", "1 1/2 cups", "2 x 400g", "½ wedge")
+turned into a canonical amount and dimension.
+
+Amounts are millilitres for volume, grams for mass and units as sold for
+count, either pieces or a package ("can", "head", "clove"). Pantry lots
+and recipe requirements store the result next to the original text when
+they are written, so totals and "is there enough" checks are plain
+arithmetic. Counts only add up within the same unit: two cloves are not
+two heads of garlic. Per-item tables convert between volume and mass
+(densities) and turn packages such as "2 cans" of chickpeas into weights
+where the usual size is known.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.db import models
+
+
+class Dimension(models.IntegerChoices):
+    VOLUME = 1
+    MASS = 2
+    COUNT = 3
+
+
+CANONICAL_UNITS = {Dimension.VOLUME: 'ml', Dimension.MASS: 'g', Dimension.COUNT: 'pcs'}
+
+# Spelling -> (canonical unit, dimension, amount in the canonical unit).
+UNITS = {}
+
+
+def _units(dimension, factor, *spellings, canonical=None):
+    for spelling in spellings:
+        UNITS[spelling] = (canonical or CANONICAL_UNITS[dimension], dimension, factor)
+
+
+_units(Dimension.VOLUME, 1, 'ml', 'milliliter', 'millilitre', 'cc')
+_units(Dimension.VOLUME, 10, 'cl', 'centiliter', 'centilitre')
+_units(Dimension.VOLUME, 100, 'dl', 'deciliter', 'decilitre')
+_units(Dimension.VOLUME, 1000, 'l', 'liter', 'litre', 'ltr')
+_units(Dimension.VOLUME, 4.92892, 'tsp', 'teaspoon')
+_units(Dimension.VOLUME, 14.7868, 'tbsp', 'tablespoon', 'tbs', 'tbl')
+_units(Dimension.VOLUME, 29.5735, 'fl oz', 'floz', 'fluid ounce')
+_units(Dimension.VOLUME, 240, 'cup')
+_units(Dimension.VOLUME, 473.176, 'pint', 'pt')
+_units(Dimension.VOLUME, 946.353, 'quart', 'qt')
+_units(Dimension.VOLUME, 3785.41, 'gallon', 'gal')
+_units(Dimension.MASS, 0.001, 'mg', 'milligram', 'milligramme')
+_units(Dimension.MASS, 1, 'g', 'gr', 'gram', 'gramme')
+_units(Dimension.MASS, 1000, 'kg', 'kilo', 'kilogram', 'kilogramme')
+_units(Dimension.MASS, 28.3495, 'oz', 'ounce')
+_units(Dimension.MASS, 453.592, 'lb', 'lbs', 'pound')
+_units(Dimension.COUNT, 1, 'pc', 'pcs', 'piece', 'x', 'each', 'ea', 'whole', 'item')
+_units(Dimension.COUNT, 12, 'dozen', 'doz')
+for _package in (
+    ('can', 'tin'), ('bunch',), ('wedge',), ('pack', 'packet'), ('bag',), ('bottle',),
+    ('jar',), ('carton',), ('box',), ('block',), ('head',), ('clove',), ('slice',),
+    ('sprig',), ('stick',), ('loaf',),
+):
+    _units(Dimension.COUNT, 1, *_package, canonical=_package[0])
+
+# Grams per millilitre, by lower-case ingredient name.
+DENSITIES = {
+    'water': 1.0, 'milk': 1.03, 'cream': 1.0, 'heavy cream': 1.0, 'buttermilk': 1.03,
+    'yogurt': 1.03, 'greek yogurt': 1.05, 'coconut milk': 0.97, 'stock': 1.0,
+    'olive oil': 0.91, 'vegetable oil': 0.92, 'oil': 0.92, 'butter': 0.91,
+    'honey': 1.42, 'maple syrup': 1.32, 'soy sauce': 1.2, 'vinegar': 1.01,
+    'flour': 0.53, 'all-purpose flour': 0.53, 'sugar': 0.85, 'brown sugar': 0.72,
+    'rice': 0.85, 'salt': 1.2, 'oats': 0.41, 'lentils': 0.8,
+}
+
+# Usual package sizes: (ingredient, package) -> (amount, dimension).
+PACKAGES = {
+    ('chickpeas', 'can'): (400, Dimension.MASS),
+    ('black beans', 'can'): (400, Dimension.MASS),
+    ('tomatoes', 'can'): (400, Dimension.MASS),
+    ('coconut milk', 'can'): (400, Dimension.VOLUME),
+    ('fresh basil', 'bunch'): (30, Dimension.MASS),
+    ('cilantro', 'bunch'): (30, Dimension.MASS),
+    ('parsley', 'bunch'): (30, Dimension.MASS),
+    ('parmesan', 'wedge'): (200, Dimension.MASS),
+    ('gnocchi', 'pack'): (500, Dimension.MASS),
+    ('pasta', 'pack'): (500, Dimension.MASS),
+    ('butter', 'block'): (250, Dimension.MASS),
+    ('butter', 'stick'): (113, Dimension.MASS),
+}
+
+VULGAR_FRACTIONS = {
+    '¼': 0.25, '½': 0.5, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3,
+    '⅛': 0.125, '⅜': 0.375, '⅝': 0.625, '⅞': 0.875,
+}
+# "1,000" and "1,250.5" group thousands; "0,5" and "1,25" use a decimal comma.
+# Anything else with a comma ("1,0000") is ambiguous and not read.
+_DECIMAL = r'(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+|,\d{1,2}(?!\d))?)'
+THOUSANDS = re.compile(r'\d{1,3}(?:,\d{3})+(?:\.\d+)?')
+_NUMBER = rf'''
+    {_DECIMAL}?\s*(?:\d+/\d+|[¼½¾⅓⅔⅛⅜⅝⅞])          # "1 1/2", "1/2", "1½"
+    | {_DECIMAL}                                     # "2", "1.5", "0,5", "1,000"
+'''
+QUANTITY = re.compile(rf'''
+    ^\s*
+    (?:(?P<packs>\d+)\s*[x×]\s*)?                      # "2 x 400g"
+    (?P<number>{_NUMBER})
+    (?:\s*(?:-|–|to)\s*(?:{_NUMBER}))?                 # "2-3": the lower bound
+    \s*(?P<unit>[^\W\d][\w .]*?)?
+    \.?\s*$
+''', re.VERBOSE | re.IGNORECASE)
+# "1 kg 500 g", "1 lb 4 oz": a number after the unit starts another part.
+NEXT_PART = re.compile(r'\s+(?=\d)')
+MIXED_NUMBER = re.compile(rf'(?P<whole>{_DECIMAL})?\s*(?P<fraction>\d+/\d+|[¼½¾⅓⅔⅛⅜⅝⅞])?')
+
+
+class Quantity(NamedTuple):
+    amount: float
+    dimension: Dimension
+    unit: str
+
+
+def _number(text):
+    match = MIXED_NUMBER.fullmatch(text.strip())
+    whole, fraction = match['whole'], match['fraction']
+    if not whole:
+        value = 0.0
+    elif THOUSANDS.fullmatch(whole):
+        value = float(whole.replace(',', ''))
+    else:
+        value = float(whole.replace(',', '.'))
+    if fraction in VULGAR_FRACTIONS:
+        value += VULGAR_FRACTIONS[fraction]
+    elif fraction:
+        numerator, denominator = fraction.split('/')
+        if int(denominator) == 0:
+            raise ZeroDivisionError
+        value += int(numerator) / int(denominator)
+    return value
+
+
+def _unit(text):
+    text = ' '.join(text.lower().replace('.', ' ').split())
+    words = text.split(' ')
+    # "fl oz", then "cups of milk" -> "cups".
+    for candidate in (text, ' '.join(words[:2]), words[0]):
+        for spelling in (candidate, candidate[:-1], candidate[:-2]):
+            if spelling in UNITS and (spelling == candidate or candidate.endswith('s')):
+                return UNITS[spelling]
+    # "3 ripe avocados": the number counts the things themselves.
+    return UNITS['pc']
+
+
+@lru_cache(maxsize=4096)
+def parse(text):
+    """
+    Parse a quantity into a ``Quantity`` in canonical units, or ``None``
+    when it carries no number ("some", "to taste") or its parts do not add
+    up ("1 can 400 g"). Memoized: the same spellings come up again and
+    again.
+    """
+    match = QUANTITY.match(text)
+    if match is None:
+        return None
+    try:
+        amount = _number(match['number'])
+    except ZeroDivisionError:
+        return None
+    unit, rest = match['unit'], None
+    if unit:
+        unit, *rest = NEXT_PART.split(unit, maxsplit=1)
+    canonical, dimension, factor = _unit(unit) if unit else UNITS['pc']
+    amount *= factor
+    if rest:
+        more = parse(rest[0])
+        if more is None or more.unit != canonical:
+            return None
+        amount += more.amount
+    return Quantity(amount * int(match['packs'] or 1), dimension, canonical)
+
+
+def normalize(text, ingredient=''):
+    """
+    Return ``(amount, dimension, unit)`` for a quantity of the named
+    ingredient, or ``(None, None, '')`` if it cannot be read. Known package
+    sizes turn counts of packages into weights or volumes; other packages
+    keep their own unit.
+    """
+    quantity = parse(text) if text else None
+    if quantity is None:
+        return None, None, ''
+    if quantity.dimension == Dimension.COUNT and quantity.unit != 'pcs':
+        package = PACKAGES.get((ingredient.lower(), quantity.unit))
+        if package is not None:
+            amount, dimension = package
+            return Quantity(quantity.amount * amount, dimension, CANONICAL_UNITS[dimension])
+    return quantity
+
+
+def normalize_many(pairs):
+    """
+    ``normalize()`` for an iterable of ``(text, ingredient name)`` pairs, e.g.
+    an import batch; returns a list of ``(amount, dimension, unit)``.
+    """
+    return [normalize(text, ingredient) for text, ingredient in pairs]
+
+
+def convert(amount, source, target, ingredient=''):
+    """
+    Express ``amount`` of ``source`` dimension in ``target``; ``None`` if the
+    ingredient's density is unknown or the dimensions cannot be converted.
+    """
+    if source == target:
+        return amount
+    density = DENSITIES.get(ingredient.lower())
+    if density is None:
+        return None
+    if (source, target) == (Dimension.VOLUME, Dimension.MASS):
+        return amount * density
+    if (source, target) == (Dimension.MASS, Dimension.VOLUME):
+        return amount / density
+    return None
+
+
+def total_in(totals, unit, ingredient=''):
+    """
+    Sum ``{unit: amount}`` totals (canonical units) into one ``unit``,
+    converting volume and mass where the density allows; counts only add
+    up in the same unit. ``None`` if nothing could be counted.
+    """
+    converted = []
+    for source, amount in totals.items():
+        if source == unit:
+            converted.append(amount)
+        elif Dimension.COUNT not in (UNITS[source][1], UNITS[unit][1]):
+            converted.append(convert(amount, UNITS[source][1], UNITS[unit][1], ingredient))
+    converted = [amount for amount in converted if amount is not None]
+    return sum(converted) if converted else None
+
+
+def describe(amount, unit):
+    if amount is None:
+        return None
+    return {'amount': round(amount, 2), 'unit': unit}
@@ -0,0 +1,332 @@
+"""
+Cooking radar: which dishes can be cooked from a pantry, and what is missing.
+
+The catalog is folded into an inverted index (ingredient id -> recipe ids)
+plus a per-recipe count of required ingredients. Matching a pantry is then a
+counting pass over the postings of the ingredients on hand: a recipe is ready
+once its counter reaches its required count, and ``required - have`` is the
+number of missing ingredients. Recipes sharing no ingredient with the pantry
+are never touched.
+
+``PantryMatcher`` keeps those counters between requests so a single pantry
+change only revisits the postings of the ingredient that changed.
+
+Each process builds its own index, tagged with the catalog version kept in
+the shared cache. Catalog writes bump that version, so every worker sees
+its index is stale on the next request, and plan caches keyed by it never
+mix catalogs.
+"""
+
+import heapq
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+
+from django.conf import settings
+
+from myproject import caching
+
+CATALOG_KEY = 'radar:catalog'
+
+
+def catalog_version():
+    """The shared catalog version: the generation of ``CATALOG_KEY``."""
+    return caching.generation(CATALOG_KEY)
+
+
+async def acatalog_version():
+    return await caching.ageneration(CATALOG_KEY)
+
+
+def bump_catalog_version():
+    caching.bump(CATALOG_KEY)
+
+
+@dataclass(frozen=True)
+class Match:
+    recipe_id: int
+    have: int
+    required: int
+    missing: tuple
+
+    @property
+    def can_cook(self):
+        return not self.missing
+
+
+class RecipeIndex:
+    """Immutable ingredient -> recipe index over the whole catalog."""
+
+    def __init__(self, requirements, ingredient_names=None, version=0):
+        postings = {}
+        by_recipe = {}
+        for recipe_id, ingredient_id in requirements:
+            postings.setdefault(ingredient_id, []).append(recipe_id)
+            by_recipe.setdefault(recipe_id, []).append(ingredient_id)
+        self.postings = {key: tuple(ids) for key, ids in postings.items()}
+        self.recipe_ingredients = {key: tuple(ids) for key, ids in by_recipe.items()}
+        self.required = {key: len(ids) for key, ids in by_recipe.items()}
+        self.max_required = max(self.required.values(), default=0)
+        # Tie-break order within a bucket: more ingredients used, then id.
+        self.position = {
+            key: rank for rank, key in enumerate(
+                sorted(self.required, key=lambda key: (-self.required[key], key))
+            )
+        }
+        self.ingredient_names = dict(ingredient_names or {})
+        self.ingredient_ids = {
+            name.lower(): key for key, name in self.ingredient_names.items()
+        }
+        self.version = version
+
+    @classmethod
+    def from_db(cls, version=0):
+        from .models import Ingredient, RecipeIngredient
+
+        requirements = RecipeIngredient.objects.values_list(
+            'recipe_id', 'ingredient_id'
+        ).iterator(chunk_size=10_000)
+        names = Ingredient.objects.values_list('id', 'name')
+        return cls(requirements, names, version=version)
+
+    def resolve(self, items):
+        """Map ingredient ids or names to ids, dropping unknown entries."""
+        ids = set()
+        for item in items:
+            if isinstance(item, int):
+                ids.add(item)
+            elif isinstance(item, str):
+                key = self.ingredient_ids.get(item.strip().lower())
+                if key is not None:
+                    ids.add(key)
+        return ids
+
+
+class PantryMatcher:
+    """
+    Per-pantry missing-ingredient counters, maintained incrementally.
+
+    Recipes are bucketed by how many ingredients they still miss, so ranking
+    reads the lowest buckets instead of sorting the whole catalog, and an
+    ingredient change only moves the recipes in that ingredient's postings.
+    """
+
+    def __init__(self, index, pantry=()):
+        self.index = index
+        self.pantry = set(pantry)
+        self.lock = threading.Lock()
+        postings = index.postings
+        required = index.required
+        have = Counter(
+            chain.from_iterable(postings.get(key, ()) for key in self.pantry)
+        )
+        # Only recipes sharing at least one ingredient with the pantry are
+        # tracked; the rest can never be ranked.
+        missing = {recipe_id: required[recipe_id] - count for recipe_id, count in have.items()}
+        buckets = [set() for _ in range(index.max_required + 1)]
+        for recipe_id, count in missing.items():
+            buckets[count].add(recipe_id)
+        self.missing_counts = missing
+        self.buckets = buckets
+
+    @property
+    def ready_count(self):
+        return len(self.buckets[0])
+
+    def add(self, ingredient_id):
+        """Add an ingredient; return the recipe ids whose counters moved."""
+        if ingredient_id in self.pantry:
+            return ()
+        self.pantry.add(ingredient_id)
+        affected = self.index.postings.get(ingredient_id, ())
+        required = self.index.required
+        missing = self.missing_counts
+        buckets = self.buckets
+        for recipe_id in affected:
+            count = missing.get(recipe_id)
+            if count is None:
+                count = required[recipe_id]
+            else:
+                buckets[count].discard(recipe_id)
+            count -= 1
+            buckets[count].add(recipe_id)
+            missing[recipe_id] = count
+        return affected
+
+    def remove(self, ingredient_id):
+        """Remove an ingredient; return the recipe ids whose counters moved."""
+        if ingredient_id not in self.pantry:
+            return ()
+        self.pantry.discard(ingredient_id)
+        affected = self.index.postings.get(ingredient_id, ())
+        required = self.index.required
+        missing = self.missing_counts
+        buckets = self.buckets
+        for recipe_id in affected:
+            count = missing[recipe_id]
+            buckets[count].discard(recipe_id)
+            count += 1
+            if count == required[recipe_id]:
+                del missing[recipe_id]
+            else:
+                buckets[count].add(recipe_id)
+                missing[recipe_id] = count
+        return affected
+
+    def sync(self, pantry):
+        """Move to ``pantry`` by applying only the ingredients that changed."""
+        pantry = set(pantry)
+        for ingredient_id in self.pantry - pantry:
+            self.remove(ingredient_id)
+        for ingredient_id in pantry - self.pantry:
+            self.add(ingredient_id)
+
+    def missing(self, recipe_id):
+        pantry = self.pantry
+        return tuple(
+            key for key in self.index.recipe_ingredients.get(recipe_id, ())
+            if key not in pantry
+        )
+
+    def rank(self, limit=20, max_missing=None):
+        """
+        Return the best ``limit`` matches: fewest missing ingredients first,
+        then most ingredients used, then recipe id for a stable order.
+        """
+        index = self.index
+        required = index.required
+        position = index.position.__getitem__
+        top = max(len(self.buckets) - 1, 0)
+        if max_missing is not None:
+            top = min(top, max_missing)
+        matches = []
+        for count, bucket in enumerate(self.buckets[:top + 1]):
+            if len(matches) >= limit:
+                break
+            for recipe_id in heapq.nsmallest(limit - len(matches), bucket, key=position):
+                matches.append(Match(
+                    recipe_id, required[recipe_id] - count, required[recipe_id],
+                    self.missing(recipe_id),
+                ))
+        return matches
+
+
+class RadarCache:
+    """
+    Process-wide holder for the current index and an LRU of live matchers.
+
+    The index is rebuilt lazily once the shared catalog version moves on
+    (see ``invalidate()``); matchers built against an older index are rebuilt
+    from their pantry on next use.
+    """
+
+    def __init__(self, max_matchers=1024):
+        self.max_matchers = max_matchers
+        self._lock = threading.Lock()
+        self._rebuild = threading.Lock()
+        self._index = None
+        self._matchers = OrderedDict()
+
+    def invalidate(self):
+        """Mark the catalog changed, for every process sharing the cache."""
+        bump_catalog_version()
+
+    def index(self):
+        version = catalog_version()
+        current = self._index
+        if current is not None and current.version == version:
+            return current
+        # One thread rebuilds; the others keep serving the previous index
+        # meanwhile and only wait when there is none yet.
+        if not self._rebuild.acquire(blocking=current is None):
+            return current
+        try:
+            current = self._index
+            if current is None or current.version != version:
+                current = RecipeIndex.from_db(version=version)
+                self._index = current
+            return current
+        finally:
+            self._rebuild.release()
+
+    def _matcher(self, key, index, pantry):
+        with self._lock:
+            matcher = self._matchers.get(key) if key is not None else None
+            if matcher is not None and matcher.index is not index:
+                matcher = None
+        if matcher is None:
+            matcher = PantryMatcher(index, pantry)
+        if key is not None:
+            with self._lock:
+                self._matchers[key] = matcher
+                self._matchers.move_to_end(key)
+                while len(self._matchers) > self.max_matchers:
+                    self._matchers.popitem(last=False)
+        return matcher
+
+    def match(self, key, pantry, limit=20, max_missing=None):
+        """
+        Rank dishes for ``pantry``, reusing the matcher cached under ``key``.
+
+        Only ingredients that differ from the cached pantry are applied. A
+        ``key`` of ``None`` matches without caching anything.
+        """
+        index = self.index()
+        matcher = self._matcher(key, index, pantry)
+        with matcher.lock:
+            matcher.sync(pantry)
+            matches = matcher.rank(limit, max_missing)
+        return index, matches
+
+    def ready_count(self, key, pantry):
+        """Number of dishes ``pantry`` can cook without buying anything."""
+        matcher = self._matcher(key, self.index(), pantry)
+        with matcher.lock:
+            matcher.sync(pantry)
+            return matcher.ready_count
+
+    def forget(self, key):
+        with self._lock:
+            self._matchers.pop(key, None)
+
+
+def _serialize_matches(index, matches, recipes):
+    names = index.ingredient_names
+    dishes = []
+    for match in matches:
+        recipe = recipes.get(match.recipe_id)
+        if recipe is None:
+            continue
+        dishes.append({
+            'id': recipe.pk,
+            'title': recipe.title,
+            'ready_in_minutes': recipe.ready_in_minutes,
+            'difficulty': recipe.difficulty,
+            'tags': [tag.name for tag in recipe.tags.all()],
+            'have': match.have,
+            'required': match.required,
+            'missing': [names.get(key, '') for key in match.missing],
+            'can_cook': match.can_cook,
+        })
+    return dishes
+
+
+def describe_matches(index, matches):
+    """Serialize ranked matches for the API, loading recipe rows in one go."""
+    from .models import Recipe
+
+    recipes = Recipe.objects.prefetch_related('tags')
+    ids = [match.recipe_id for match in matches]
+    return _serialize_matches(index, matches, recipes.in_bulk(ids))
+
+
+async def adescribe_matches(index, matches):
+    from .models import Recipe
+
+    recipes = Recipe.objects.prefetch_related('tags')
+    ids = [match.recipe_id for match in matches]
+    return _serialize_matches(index, matches, await recipes.ain_bulk(ids))
+
+
+radar = RadarCache(getattr(settings, 'RADAR_MATCHER_CACHE_SIZE', 1024))
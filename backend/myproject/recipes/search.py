@@ -0,0 +1,151 @@
+"""
+Recipe search over the SQLite FTS5 index created in migration 0002.
+
+Text matches are ranked with bm25 (title weighted above summary). Tag filters
+and facet counts read the covering (tag_id, recipe_id) index on the recipe/tag
+join table. Pages are keyset-paginated on ``(score, id)``, or on ``id`` alone
+when there is no text query, so deep pages cost the same as the first one.
+"""
+
+import base64
+import binascii
+import json
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import prefetch_related_objects
+
+from .models import Recipe, Tag
+
+TERM_RE = re.compile(r'\w+')
+TITLE_WEIGHT = 10.0
+SUMMARY_WEIGHT = 1.0
+
+RECIPE_TABLE = Recipe._meta.db_table
+RECIPE_TAGS_TABLE = Recipe.tags.through._meta.db_table
+FTS_TABLE = f'{RECIPE_TABLE}_fts'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class SearchPage:
+    results: list
+    facets: dict
+    next_cursor: str = None
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query: every word, as a prefix, must match."""
+    return ' '.join(f'"{term}"*' for term in TERM_RE.findall(query.lower()))
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    if not all(isinstance(value, (int, float)) for value in values):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def facet_counts(match, facet_names):
+    """Count matching recipes per facet tag, ignoring the active tag filters."""
+    tag_ids = dict(Tag.objects.filter(name__in=facet_names).values_list('id', 'name'))
+    counts = dict.fromkeys(facet_names, 0)
+    if not tag_ids:
+        return counts
+    placeholders = ', '.join(['%s'] * len(tag_ids))
+    if match:
+        sql = (
+            f'SELECT rt.tag_id, COUNT(*) FROM {FTS_TABLE} f '
+            f'JOIN {RECIPE_TAGS_TABLE} rt ON rt.recipe_id = f.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND rt.tag_id IN ({placeholders}) '
+            f'GROUP BY rt.tag_id'
+        )
+        params = [match, *tag_ids]
+    else:
+        sql = (
+            f'SELECT tag_id, COUNT(*) FROM {RECIPE_TAGS_TABLE} '
+            f'WHERE tag_id IN ({placeholders}) GROUP BY tag_id'
+        )
+        params = list(tag_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for tag_id, count in cursor.fetchall():
+            counts[tag_ids[tag_id]] = count
+    return counts
+
+
+def search_recipes(query='', tags=(), cursor=None, limit=20, facets=None):
+    """
+    Return one page of recipes matching ``query`` and any of ``tags``.
+
+    ``cursor`` is the ``next_cursor`` of the previous page. Raises
+    ``InvalidCursor`` for a cursor that was not produced by this function.
+    """
+    match = match_expression(query)
+    facets = settings.RECIPE_SEARCH_FACETS if facets is None else facets
+    tags = list(dict.fromkeys(tags))
+    where, params = [], []
+
+    if tags:
+        tag_ids = list(Tag.objects.filter(name__in=tags).values_list('id', flat=True))
+        if not tag_ids:
+            return SearchPage([], facet_counts(match, facets))
+        placeholders = ', '.join(['%s'] * len(tag_ids))
+        where.append(
+            f'r.id IN (SELECT recipe_id FROM {RECIPE_TAGS_TABLE} '
+            f'WHERE tag_id IN ({placeholders}))'
+        )
+        params.extend(tag_ids)
+
+    if match:
+        source = (
+            f'(SELECT rowid AS rid, bm25({FTS_TABLE}, %s, %s) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) f '
+            f'JOIN {RECIPE_TABLE} r ON r.id = f.rid'
+        )
+        params = [TITLE_WEIGHT, SUMMARY_WEIGHT, match, *params]
+        order = 'f.score, r.id'
+        if cursor:
+            score, last_id = decode_cursor(cursor, 2)
+            where.append('(f.score > %s OR (f.score = %s AND r.id > %s))')
+            params.extend([score, score, last_id])
+        columns = 'r.*, f.score AS score'
+    else:
+        source = f'{RECIPE_TABLE} r'
+        order = 'r.id'
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            where.append('r.id > %s')
+            params.append(last_id)
+        columns = 'r.*, NULL AS score'
+
+    sql = f'SELECT {columns} FROM {source}'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {order} LIMIT %s'
+    params.append(limit + 1)
+
+    results = list(Recipe.objects.raw(sql, params))
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor([last.score, last.pk] if match else [last.pk])
+    prefetch_related_objects(results, 'tags')
+    return SearchPage(results, facet_counts(match, facets), next_cursor)
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Ingredient, RecipeIngredient
+from .radar import radar
+
+
+def invalidate_index():
+    radar.invalidate()
+    # Another thread may rebuild from the old rows before the writer commits.
+    transaction.on_commit(radar.invalidate)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_radar_index(sender, **kwargs):
+    # bulk_create()/update() bypass signals; loaders using them must call
+    # radar.invalidate() themselves.
+    invalidate_index()
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, **kwargs):
+    # A new ingredient has no postings until a recipe uses it, and that
+    # RecipeIngredient save invalidates the index; only renames matter here.
+    if not created:
+        invalidate_index()
@@ -0,0 +1,321 @@
+import datetime
+import json
+import random
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import planner, quantities
+from .models import Ingredient, Recipe, RecipeIngredient, Tag
+from .quantities import Dimension
+from .radar import PantryMatcher, RadarCache, RecipeIndex, radar
+
+
+class PantryMatcherTests(SimpleTestCase):
+    def setUp(self):
+        # recipe -> ingredients: 1 = {1, 2}, 2 = {1, 2, 3}, 3 = {4}
+        self.index = RecipeIndex([(1, 1), (1, 2), (2, 1), (2, 2), (2, 3), (3, 4)])
+
+    def test_rank_orders_by_missing_then_coverage(self):
+        matcher = PantryMatcher(self.index, {1, 2})
+        ranked = matcher.rank()
+        self.assertEqual([match.recipe_id for match in ranked], [1, 2])
+        self.assertTrue(ranked[0].can_cook)
+        self.assertEqual(ranked[1].missing, (3,))
+        self.assertEqual(matcher.ready_count, 1)
+
+    def test_recipes_without_overlap_are_not_ranked(self):
+        self.assertEqual(PantryMatcher(self.index, {4}).rank()[0].recipe_id, 3)
+        self.assertEqual(len(PantryMatcher(self.index, {4}).rank()), 1)
+        self.assertEqual(PantryMatcher(self.index).rank(), [])
+
+    def test_max_missing(self):
+        matcher = PantryMatcher(self.index, {1})
+        self.assertEqual([m.recipe_id for m in matcher.rank(max_missing=1)], [1])
+
+    def test_incremental_updates_match_a_fresh_build(self):
+        rng = random.Random(7)
+        requirements = [
+            (recipe_id, key)
+            for recipe_id in range(300)
+            for key in rng.sample(range(40), rng.randint(1, 6))
+        ]
+        index = RecipeIndex(requirements)
+        matcher = PantryMatcher(index)
+        for _ in range(200):
+            pantry = set(matcher.pantry)
+            pantry.symmetric_difference_update({rng.randrange(40)})
+            matcher.sync(pantry)
+            fresh = PantryMatcher(index, pantry)
+            self.assertEqual(matcher.missing_counts, fresh.missing_counts)
+            self.assertEqual(matcher.rank(15), fresh.rank(15))
+
+    def test_add_only_touches_postings(self):
+        matcher = PantryMatcher(self.index, {1})
+        self.assertEqual(set(matcher.add(4)), {3})
+        self.assertEqual(matcher.add(4), ())
+
+
+class QuantityTests(SimpleTestCase):
+    def test_parse(self):
+        cases = {
+            '1L': (1000, Dimension.VOLUME),
+            '500 ml': (500, Dimension.VOLUME),
+            '1 1/2 cups': (360, Dimension.VOLUME),
+            '½ tsp': (2.46446, Dimension.VOLUME),
+            '120g': (120, Dimension.MASS),
+            '1,5 kg': (1500, Dimension.MASS),
+            '0,25 l': (250, Dimension.VOLUME),
+            '1,000 g': (1000, Dimension.MASS),
+            '1,250.5 g': (1250.5, Dimension.MASS),
+            '2 x 400g': (800, Dimension.MASS),
+            '1 kg 500 g': (1500, Dimension.MASS),
+            '1 lb 4 oz': (566.99, Dimension.MASS),
+            '2-3 lbs': (907.184, Dimension.MASS),
+            '4 pcs': (4, Dimension.COUNT),
+            '3 ripe avocados': (3, Dimension.COUNT),
+            '1 dozen': (12, Dimension.COUNT),
+            '2': (2, Dimension.COUNT),
+        }
+        for text, (amount, dimension) in cases.items():
+            with self.subTest(text):
+                quantity = quantities.parse(text)
+                self.assertAlmostEqual(quantity.amount, amount)
+                self.assertEqual(quantity.dimension, dimension)
+        for text in ('some', 'to taste', '1/0 cup', '1,0000 g', '1 can 400 g', ''):
+            with self.subTest(text):
+                self.assertIsNone(quantities.parse(text))
+
+    def test_packages_and_densities(self):
+        self.assertEqual(quantities.normalize('2 cans', 'Chickpeas'), (800, Dimension.MASS, 'g'))
+        self.assertEqual(quantities.normalize('1 tin', 'Chickpeas'), (400, Dimension.MASS, 'g'))
+        self.assertEqual(
+            quantities.normalize('1/2 wedge', 'Parmesan'), (100, Dimension.MASS, 'g')
+        )
+        self.assertEqual(quantities.normalize('2 cans', 'Sardines'), (2, Dimension.COUNT, 'can'))
+        self.assertEqual(quantities.normalize('', 'Milk'), (None, None, ''))
+        self.assertAlmostEqual(
+            quantities.convert(1000, Dimension.VOLUME, Dimension.MASS, 'Milk'), 1030
+        )
+        self.assertIsNone(quantities.convert(1, Dimension.MASS, Dimension.VOLUME, 'Saffron'))
+        totals = {'ml': 1000, 'g': 515}
+        self.assertAlmostEqual(quantities.total_in(totals, 'ml', 'Milk'), 1500)
+
+    def test_counts_only_add_up_in_the_same_unit(self):
+        totals = {'head': 1, 'pcs': 2}
+        self.assertEqual(quantities.total_in(totals, 'head', 'Garlic'), 1)
+        self.assertIsNone(quantities.total_in(totals, 'clove', 'Garlic'))
+        self.assertIsNone(quantities.total_in({'g': 100}, 'pcs', 'Garlic'))
+        self.assertEqual(quantities.describe(2, 'can'), {'amount': 2, 'unit': 'can'})
+
+
+class PlannerTests(SimpleTestCase):
+    def setUp(self):
+        # Greedy takes recipe 10 (four items) first; 11 and 12 cover all six.
+        self.problem = planner.Problem(
+            days=2,
+            recipes=((10, (2, 3, 4, 5), ()), (11, (1, 2, 3), ()), (12, (4, 5, 6), ())),
+            weights={key: 1.0 for key in range(1, 7)},
+            expires_in={key: None for key in range(1, 7)},
+        )
+
+    def test_search_improves_on_greedy(self):
+        self.assertEqual(planner.greedy(self.problem).score, 5)
+        plan = planner.solve(self.problem, time.time() + 5)
+        self.assertEqual(set(plan.recipe_ids), {11, 12})
+        self.assertEqual(plan.score, 6)
+        self.assertTrue(plan.complete)
+
+    def test_deadline_returns_best_so_far(self):
+        plan = planner.solve(self.problem, time.time() - 1)
+        self.assertEqual(len(plan.recipe_ids), 2)
+        self.assertEqual(plan.score, 5)
+        self.assertFalse(plan.complete)
+
+    def test_build_problem_weighs_expiring_lots(self):
+        # recipe -> ingredients: 1 = {1, 2}, 2 = {2, 3}, 3 = {4}
+        index = RecipeIndex([(1, 1), (1, 2), (2, 2), (2, 3), (3, 4)])
+        today = datetime.date(2026, 1, 1)
+        lots = [(1, today + datetime.timedelta(days=1)), (2, None), (3, today)]
+        problem = planner.build_problem(index, lots, 3, today)
+        self.assertEqual({row[0] for row in problem.recipes}, {1, 2})
+        self.assertGreater(problem.weights[3], problem.weights[1])
+        self.assertEqual(problem.weights[2], planner.STOCK_WEIGHT)
+        plan = planner.solve(problem, time.time() + 5)
+        # Recipe 2 uses the item expiring today, so it comes first.
+        self.assertEqual(plan.recipe_ids, (2, 1))
+
+    def test_lots_only_count_until_they_expire(self):
+        # Three items all expiring today: only the first day's meal saves one.
+        index = RecipeIndex([(1, 1), (2, 2), (3, 3)])
+        today = datetime.date(2026, 1, 1)
+        problem = planner.build_problem(index, [(1, today), (2, today), (3, today)], 3, today)
+        plan = planner.solve(problem, time.time() + 5)
+        self.assertEqual(len(plan.recipe_ids), 3)
+        self.assertAlmostEqual(plan.score, planner.lot_weight(0, 3))
+        self.assertEqual(planner.rescued(problem, plan.recipe_ids), {plan.recipe_ids[0]})
+
+    def test_search_moves_urgent_recipes_earlier(self):
+        # Greedy cooks recipe 1 (two items good until tomorrow) first, which
+        # leaves recipe 2's item (good today only) to expire.
+        index = RecipeIndex([(1, 1), (1, 2), (2, 3)])
+        today = datetime.date(2026, 1, 1)
+        tomorrow = today + datetime.timedelta(days=1)
+        problem = planner.build_problem(index, [(1, tomorrow), (2, tomorrow), (3, today)], 2, today)
+        self.assertEqual(planner.schedule(problem, planner.greedy(problem)), (1, 2))
+        plan = planner.solve(problem, time.time() + 5)
+        self.assertEqual(plan.recipe_ids, (2, 1))
+        self.assertAlmostEqual(plan.score, planner.lot_weight(0, 2) + 2 * planner.lot_weight(1, 2))
+        self.assertEqual(planner.rescued(problem, plan.recipe_ids), {1, 2, 3})
+
+    @override_settings(PLANNER_WORKERS=1)
+    def test_solves_in_process_pool(self):
+        try:
+            plan = async_to_sync(planner.asolve)(self.problem, budget=2)
+        finally:
+            planner.shutdown(wait=True)
+        self.assertTrue(plan.searched)
+        self.assertEqual(set(plan.recipe_ids), {11, 12})
+
+
+class RadarViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        vegetarian = Tag.objects.create(name='Vegetarian')
+        names = ['gnocchi', 'basil', 'parmesan', 'salmon', 'sesame seeds']
+        cls.ingredients = {name: Ingredient.objects.create(name=name) for name in names}
+        cls.gnocchi = Recipe.objects.create(title='Creamy Pesto Gnocchi', ready_in_minutes=22)
+        cls.gnocchi.tags.add(vegetarian)
+        cls.salmon = Recipe.objects.create(title='Miso-Glazed Salmon Bowl', ready_in_minutes=28)
+        for recipe, needs in (
+            (cls.gnocchi, ['gnocchi', 'basil', 'parmesan']),
+            (cls.salmon, ['salmon', 'sesame seeds']),
+        ):
+            for name in needs:
+                RecipeIngredient.objects.create(recipe=recipe, ingredient=cls.ingredients[name])
+
+    def setUp(self):
+        radar.invalidate()
+
+    def post(self, payload):
+        return self.client.post(
+            reverse('recipes:radar'), json.dumps(payload), content_type='application/json'
+        )
+
+    def test_ranks_dishes_with_missing_ingredients(self):
+        response = self.post({'pantry': ['Gnocchi', 'basil', 'parmesan', 'salmon']})
+        self.assertEqual(response.status_code, 200)
+        dishes = response.json()['dishes']
+        self.assertEqual([dish['title'] for dish in dishes], [
+            'Creamy Pesto Gnocchi', 'Miso-Glazed Salmon Bowl',
+        ])
+        self.assertTrue(dishes[0]['can_cook'])
+        self.assertEqual(dishes[0]['tags'], ['Vegetarian'])
+        self.assertEqual(dishes[1]['missing'], ['sesame seeds'])
+
+    def test_catalog_changes_invalidate_the_index(self):
+        self.post({'pantry': ['salmon', 'sesame seeds']})
+        RecipeIngredient.objects.filter(ingredient=self.ingredients['sesame seeds']).delete()
+        dishes = self.post({'pantry': ['salmon']}).json()['dishes']
+        self.assertTrue(dishes[0]['can_cook'])
+
+    def test_index_is_invalidated_again_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            RecipeIngredient.objects.create(
+                recipe=self.salmon, ingredient=self.ingredients['basil']
+            )
+            # Stands in for a reader rebuilding before the writer commits.
+            early = radar.index()
+        self.assertIsNot(radar.index(), early)
+
+    def test_other_workers_see_catalog_changes(self):
+        worker = RadarCache()
+        before = worker.index()
+        with self.captureOnCommitCallbacks(execute=True):
+            RecipeIngredient.objects.create(
+                recipe=self.salmon, ingredient=self.ingredients['basil']
+            )
+        # While one thread rebuilds, the others keep the previous index.
+        with worker._rebuild:
+            self.assertIs(worker.index(), before)
+        after = worker.index()
+        self.assertGreater(after.version, before.version)
+        self.assertIn(self.salmon.pk, after.postings[self.ingredients['basil'].pk])
+
+    def test_rejects_malformed_payload(self):
+        self.assertEqual(self.post({'pantry': 'milk'}).status_code, 400)
+        self.assertEqual(self.post({'pantry': [], 'limit': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('recipes:radar')).status_code, 405)
+
+
+class RecipeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tags = {name: Tag.objects.create(name=name) for name in ['Vegan', 'Comfort', 'High-protein']}
+        rows = [
+            ('Coconut Lentil Curry', 'Comforting, freezer-friendly curry.', ['Vegan', 'Comfort']),
+            ('Chickpea Curry', 'Weeknight curry with spinach.', ['Vegan']),
+            ('Lemon Dill Salmon', 'Bright bowl with a curry-spiced slaw.', ['High-protein']),
+            ('Slow Baked Ribs', 'Sticky and smoky.', ['Comfort']),
+        ]
+        cls.recipes = {}
+        for title, summary, names in rows:
+            recipe = Recipe.objects.create(title=title, summary=summary)
+            recipe.tags.set([tags[name] for name in names])
+            cls.recipes[title] = recipe
+
+    def search(self, **params):
+        response = self.client.get(reverse('recipes:search'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def titles(self, payload):
+        return [result['title'] for result in payload['results']]
+
+    def test_title_matches_rank_above_summary_matches(self):
+        payload = self.search(q='curry')
+        self.assertEqual(len(payload['results']), 3)
+        self.assertEqual(self.titles(payload)[-1], 'Lemon Dill Salmon')
+
+    def test_prefix_and_stemmed_terms(self):
+        self.assertEqual(self.titles(self.search(q='chick')), ['Chickpea Curry'])
+        self.assertIn('Coconut Lentil Curry', self.titles(self.search(q='comfort')))
+
+    def test_tag_filter_and_facets(self):
+        payload = self.search(q='curry', tag=['High-protein', 'Comfort'])
+        self.assertEqual(
+            sorted(self.titles(payload)), ['Coconut Lentil Curry', 'Lemon Dill Salmon']
+        )
+        self.assertEqual(payload['facets']['Vegan'], 2)
+        self.assertEqual(payload['facets']['Comfort'], 1)
+        self.assertEqual(payload['facets']['Sheet-pan'], 0)
+
+    def test_facets_without_query_cover_the_catalog(self):
+        payload = self.search()
+        self.assertEqual(payload['facets']['Comfort'], 2)
+        self.assertEqual(len(payload['results']), 4)
+
+    def test_cursor_pagination_walks_every_result_once(self):
+        for params in ({'q': 'curry'}, {}):
+            seen, cursor = [], None
+            while True:
+                page = self.search(limit=1, **params, **({'cursor': cursor} if cursor else {}))
+                seen.extend(self.titles(page))
+                cursor = page['next_cursor']
+                if not cursor:
+                    break
+            self.assertEqual(seen, self.titles(self.search(limit=10, **params)))
+
+    def test_index_follows_updates_and_deletes(self):
+        recipe = self.recipes['Slow Baked Ribs']
+        recipe.title = 'Slow Baked Jackfruit'
+        recipe.save()
+        self.assertEqual(self.titles(self.search(q='jackfruit')), ['Slow Baked Jackfruit'])
+        recipe.delete()
+        self.assertEqual(self.search(q='jackfruit')['results'], [])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('recipes:search'), {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
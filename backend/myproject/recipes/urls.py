@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'recipes'
+
+urlpatterns = [
+    path('radar/', views.radar_view, name='radar'),
+    path('search/', views.search_view, name='search'),
+]
@@ -0,0 +1,94 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from myproject.api import parse_json
+
+from .radar import adescribe_matches, radar
+from .search import InvalidCursor, search_recipes
+
+MAX_RADAR_RESULTS = 100
+MAX_SEARCH_RESULTS = 100
+
+
+def radar_options(params):
+    """
+    Return ``(limit, max_missing)`` from request parameters or a payload;
+    raise ``ValueError`` if they are not integers.
+    """
+    try:
+        limit = min(int(params.get('limit', 20)), MAX_RADAR_RESULTS)
+        max_missing = params.get('max_missing')
+        max_missing = None if max_missing in (None, '') else int(max_missing)
+    except (TypeError, ValueError):
+        raise ValueError('"limit" and "max_missing" must be integers.')
+    return limit, max_missing
+
+
+@require_POST
+async def radar_view(request):
+    """
+    Rank dishes for a pantry.
+
+    Expects ``{"pantry": [ingredient id or name, ...], "limit": 20,
+    "max_missing": null}`` and returns the best dishes with the ingredients
+    each one is still missing.
+    """
+    payload = parse_json(request)
+    if payload is None or not isinstance(payload.get('pantry', []), list):
+        return JsonResponse({'error': 'Expected a JSON object with a "pantry" list.'}, status=400)
+    try:
+        limit, max_missing = radar_options(payload)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    # Index builds and matching are CPU-bound; keep them off the event loop.
+    index = await sync_to_async(radar.index)()
+    pantry = index.resolve(payload.get('pantry', []))
+    user = await request.auser()
+    key = f'user:{user.pk}' if user.is_authenticated else None
+    index, matches = await sync_to_async(radar.match)(
+        key, pantry, limit=limit, max_missing=max_missing
+    )
+    return JsonResponse({'dishes': await adescribe_matches(index, matches)})
+
+
+@require_GET
+async def search_view(request):
+    """
+    Full-text recipe search.
+
+    Query parameters: ``q`` (free text), ``tag`` (repeatable; a recipe
+    matches if it has any of them), ``cursor`` (from ``next_cursor``) and
+    ``limit``. Facet counts cover the text match, before tag filtering.
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        return JsonResponse({'error': '"limit" must be an integer.'}, status=400)
+    try:
+        # Raw FTS5 SQL has no async ORM counterpart; run it in the sync thread.
+        page = await sync_to_async(search_recipes)(
+            query=request.GET.get('q', ''),
+            tags=request.GET.getlist('tag'),
+            cursor=request.GET.get('cursor') or None,
+            limit=limit,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+    return JsonResponse({
+        'results': [
+            {
+                'id': recipe.pk,
+                'title': recipe.title,
+                'summary': recipe.summary,
+                'ready_in_minutes': recipe.ready_in_minutes,
+                'difficulty': recipe.difficulty,
+                'tags': [tag.name for tag in recipe.tags.all()],
+                'score': recipe.score,
+            }
+            for recipe in page.results
+        ],
+        'facets': page.facets,
+        'next_cursor': page.next_cursor,
+    })
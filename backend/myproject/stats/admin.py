@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import UserStats
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'pantry_items', 'ready_dishes', 'updated_at', 'reconciled_at']
+    raw_id_fields = ['user']
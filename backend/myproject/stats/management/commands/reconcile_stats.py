@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from stats.services import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute dashboard counters from the pantry tables and repair any '
+        'drift. Meant to run periodically, e.g. nightly from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'user_ids', nargs='*', type=int, help='Only these users (default: all).'
+        )
+
+    def handle(self, *args, **options):
+        drifted = reconcile(options['user_ids'] or None)
+        self.stdout.write(f'Reconciled stats; {drifted} user(s) had drifted.')
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import models
+
+
+class UserStats(models.Model):
+    """
+    Dashboard counters for one user, kept current by the pantry write path.
+
+    Date-dependent figures are stored as per-day histograms (ISO date ->
+    lot count) so "expiring soon" and "added this week" can be read for any
+    day without touching the lot table.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats',
+    )
+    pantry_items = models.PositiveIntegerField(default=0)
+    ready_dishes = models.PositiveIntegerField(default=0)
+    expiry_histogram = models.JSONField(default=dict)
+    added_histogram = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'user stats'
+
+    def __str__(self):
+        return f'Stats for {self.user}'
@@ -0,0 +1,191 @@
+"""
+Per-user dashboard counters.
+
+Writes to the pantry adjust ``UserStats`` in place (see ``stats.signals``),
+reads come from the cache, under a generation key that every write bumps (see
+``myproject.caching``), and fall back to a single primary-key lookup, so
+showing the quick stats never runs COUNT or other aggregate queries. The
+``reconcile_stats`` command recomputes everything with aggregates and fixes
+any drift, e.g. from lots expiring or catalog changes that alter which
+dishes are ready.
+"""
+
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from myproject import caching
+from pantry.models import PantryLot
+from pantry.services import pantry_ingredient_ids
+from recipes.radar import radar
+
+from .models import UserStats
+
+WEEK = datetime.timedelta(days=7)
+
+
+def cache_key(user_id):
+    return f'stats:user:{user_id}'
+
+
+def invalidate(user_id):
+    caching.invalidate(cache_key(user_id))
+
+
+def snapshot(stats):
+    return {
+        'pantry_items': stats.pantry_items,
+        'ready_dishes': stats.ready_dishes,
+        'expiry_histogram': stats.expiry_histogram,
+        'added_histogram': stats.added_histogram,
+    }
+
+
+def summarize(data, today=None):
+    """Turn a stats snapshot into the figures shown on the dashboard."""
+    today = today or timezone.localdate()
+    soon = (today + datetime.timedelta(days=settings.STATS_EXPIRING_DAYS)).isoformat()
+    week_start = (today - WEEK).isoformat()
+    today = today.isoformat()
+    return {
+        'pantry_items': data['pantry_items'],
+        'added_this_week': sum(
+            count for day, count in data['added_histogram'].items() if day > week_start
+        ),
+        'ready_to_cook': data['ready_dishes'],
+        'expiring_soon': sum(
+            count for day, count in data['expiry_histogram'].items() if today <= day <= soon
+        ),
+        'expiring_within_days': settings.STATS_EXPIRING_DAYS,
+    }
+
+
+def get_stats(user_id):
+    """Return the user's stats snapshot, from the cache when possible."""
+    key = caching.versioned(cache_key(user_id))
+    data = cache.get(key)
+    if data is None:
+        stats = UserStats.objects.filter(user_id=user_id).first()
+        if stats is None:
+            stats, _ = reconcile_user(user_id)
+        data = snapshot(stats)
+        cache.set(key, data, settings.STATS_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_stats(user_id):
+    key = await caching.aversioned(cache_key(user_id))
+    data = await cache.aget(key)
+    if data is None:
+        stats = await UserStats.objects.filter(user_id=user_id).afirst()
+        if stats is None:
+            stats, _ = await sync_to_async(reconcile_user)(user_id)
+        data = snapshot(stats)
+        await cache.aset(key, data, settings.STATS_CACHE_TIMEOUT)
+    return data
+
+
+def ready_dishes_for(user_id):
+    return radar.ready_count(f'user:{user_id}', pantry_ingredient_ids(user_id))
+
+
+def _bump(histogram, day, step):
+    key = day.isoformat()
+    count = histogram.get(key, 0) + step
+    if count > 0:
+        histogram[key] = count
+    else:
+        histogram.pop(key, None)
+
+
+def _prune(stats, today):
+    today_key = today.isoformat()
+    week_key = (today - WEEK).isoformat()
+    stats.expiry_histogram = {
+        day: count for day, count in stats.expiry_histogram.items() if day >= today_key
+    }
+    stats.added_histogram = {
+        day: count for day, count in stats.added_histogram.items() if day > week_key
+    }
+
+
+def apply_lot_changes(user_id, added=(), removed=()):
+    """
+    Adjust the user's counters for lots that were added or removed. The
+    ready-dish count is refreshed once the write commits: it may rebuild
+    the radar index, which must not happen while holding the write lock.
+    """
+    today = timezone.localdate()
+    with transaction.atomic():
+        stats = UserStats.objects.select_for_update().filter(user_id=user_id).first()
+        if stats is not None:
+            for lots, step in ((added, 1), (removed, -1)):
+                for lot in lots:
+                    stats.pantry_items = max(stats.pantry_items + step, 0)
+                    if lot.expires_on is not None:
+                        _bump(stats.expiry_histogram, lot.expires_on, step)
+                    if lot.added_at is not None:
+                        _bump(stats.added_histogram, timezone.localdate(lot.added_at), step)
+            _prune(stats, today)
+            stats.save(update_fields=['pantry_items', 'expiry_histogram', 'added_histogram'])
+    if stats is None:
+        # No baseline to adjust yet; compute one from scratch instead.
+        reconcile_user(user_id)
+        return
+    invalidate(user_id)
+    transaction.on_commit(lambda: refresh_ready_dishes(user_id))
+
+
+def refresh_ready_dishes(user_id):
+    UserStats.objects.filter(user_id=user_id).update(ready_dishes=ready_dishes_for(user_id))
+    invalidate(user_id)
+
+
+def reconcile_user(user_id, today=None):
+    """
+    Recompute the user's counters from the lot table.
+
+    Returns ``(stats, drifted)`` where ``drifted`` tells whether the stored
+    counters disagreed with the recomputed ones.
+    """
+    today = today or timezone.localdate()
+    lots = PantryLot.objects.filter(user_id=user_id).order_by()
+    expiry = lots.filter(expires_on__gte=today).values_list('expires_on').annotate(Count('id'))
+    week_start = timezone.make_aware(
+        datetime.datetime.combine(today - WEEK + datetime.timedelta(days=1), datetime.time())
+    )
+    added = (
+        lots.filter(added_at__gte=week_start)
+        .annotate(day=TruncDate('added_at')).values_list('day').annotate(Count('id'))
+    )
+    fresh = {
+        'pantry_items': lots.count(),
+        'ready_dishes': ready_dishes_for(user_id),
+        'expiry_histogram': {day.isoformat(): count for day, count in expiry},
+        'added_histogram': {day.isoformat(): count for day, count in added},
+    }
+    with transaction.atomic():
+        stats, created = UserStats.objects.select_for_update().get_or_create(
+            user_id=user_id, defaults=fresh
+        )
+        drifted = not created and snapshot(stats) != fresh
+        for name, value in fresh.items():
+            setattr(stats, name, value)
+        stats.reconciled_at = timezone.now()
+        stats.save()
+    invalidate(user_id)
+    return stats, drifted
+
+
+def reconcile(user_ids=None):
+    """Reconcile the given users (default: everyone); return how many drifted."""
+    if user_ids is None:
+        user_ids = get_user_model().objects.values_list('pk', flat=True).iterator()
+    return sum(reconcile_user(user_id)[1] for user_id in user_ids)
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from pantry.models import PantryLot
+from pantry.signals import deleted_with_owner, lots_imported
+
+from . import services
+
+
+@receiver(pre_save, sender=PantryLot)
+def remember_previous_lot(sender, instance, **kwargs):
+    instance._stats_previous = None
+    if not instance._state.adding:
+        instance._stats_previous = (
+            PantryLot.objects.filter(pk=instance.pk)
+            .only('user_id', 'expires_on', 'added_at').first()
+        )
+
+
+@receiver(post_save, sender=PantryLot)
+def lot_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_stats_previous', None)
+    if previous is not None and previous.user_id != instance.user_id:
+        services.apply_lot_changes(previous.user_id, removed=[previous])
+        previous = None
+    services.apply_lot_changes(
+        instance.user_id, added=[instance], removed=[previous] if previous else []
+    )
+
+
+@receiver(post_delete, sender=PantryLot)
+def lot_deleted(sender, instance, origin=None, **kwargs):
+    if not deleted_with_owner(instance, origin):
+        services.apply_lot_changes(instance.user_id, removed=[instance])
+
+
+@receiver(lots_imported)
+def lots_bulk_imported(sender, user, lots, **kwargs):
+    services.apply_lot_changes(user.pk, added=lots)
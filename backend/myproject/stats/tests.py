@@ -0,0 +1,136 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from myproject.caching import versioned
+from pantry.models import PantryLot
+from pantry.services import import_lots
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.radar import radar
+
+from . import services
+from .models import UserStats
+
+
+def days(count):
+    return timezone.localdate() + datetime.timedelta(days=count)
+
+
+class StatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('cook', password='pw')
+        cls.milk = Ingredient.objects.create(name='Milk')
+        cls.eggs = Ingredient.objects.create(name='Eggs')
+        latte = Recipe.objects.create(title='Iced latte')
+        RecipeIngredient.objects.create(recipe=latte, ingredient=cls.milk)
+
+    def setUp(self):
+        cache.clear()
+        radar.invalidate()
+        self.client.force_login(self.user)
+
+    def add_lot(self, ingredient, expires_in=None, **kwargs):
+        expires_on = days(expires_in) if expires_in is not None else None
+        return PantryLot.objects.create(
+            user=self.user, ingredient=ingredient, expires_on=expires_on, **kwargs
+        )
+
+    def get_stats(self):
+        return self.client.get(reverse('stats:summary')).json()
+
+    def test_counters_follow_pantry_writes(self):
+        milk = self.add_lot(self.milk, 1)
+        self.add_lot(self.eggs, 10)
+        self.add_lot(self.eggs, added_at=timezone.now() - datetime.timedelta(days=10))
+        self.assertEqual(self.get_stats(), {
+            'pantry_items': 3, 'added_this_week': 2, 'ready_to_cook': 1,
+            'expiring_soon': 1, 'expiring_within_days': 3,
+        })
+        milk.expires_on = days(20)
+        milk.save()
+        self.assertEqual(self.get_stats()['expiring_soon'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            milk.delete()
+        stats = self.get_stats()
+        self.assertEqual((stats['pantry_items'], stats['ready_to_cook']), (2, 0))
+
+    def test_ready_count_is_refreshed_after_commit(self):
+        self.add_lot(self.eggs)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.add_lot(self.milk)
+            # Still inside the write: only the counters have moved.
+            stats = UserStats.objects.get(user=self.user)
+            self.assertEqual((stats.pantry_items, stats.ready_dishes), (2, 0))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get_stats()['ready_to_cook'], 1)
+
+    def test_warm_read_runs_no_aggregate_queries(self):
+        self.add_lot(self.milk, 2)
+        self.get_stats()
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.get_stats()
+        self.assertEqual(stats['pantry_items'], 1)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('COUNT(', tables.upper())
+        self.assertNotIn('pantry_pantrylot', tables)
+        self.assertNotIn('stats_userstats', tables)
+        # Sessions are cookies and the user comes from the cache.
+        self.assertEqual(len(queries), 0)
+
+    def test_cache_miss_reads_one_row(self):
+        self.add_lot(self.milk, 2)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_stats()
+        # The cleared cache also held the user: one user row, one stats row.
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('COUNT(', queries[-1]['sql'].upper())
+
+    def test_late_write_back_is_not_served(self):
+        # A reader loads the counters and picks its key, then a lot is
+        # added, then the reader stores what it loaded.
+        key = versioned(services.cache_key(self.user.pk))
+        stale = services.get_stats(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_lot(self.milk, 1)
+        cache.set(key, stale)
+        self.assertEqual(self.get_stats()['pantry_items'], 1)
+
+    def test_bulk_import_updates_counters(self):
+        self.get_stats()
+        rows = enumerate([
+            {'ingredient': 'Milk', 'expires_on': days(1).isoformat()},
+            {'ingredient': 'Eggs', 'expires_on': days(2).isoformat()},
+            {'ingredient': 'Eggs'},
+        ], start=2)
+        import_lots(self.user, rows, batch_size=2)
+        stats = self.get_stats()
+        self.assertEqual((stats['pantry_items'], stats['expiring_soon']), (3, 2))
+
+    def test_reconcile_repairs_drift(self):
+        self.add_lot(self.milk, 1)
+        UserStats.objects.filter(user=self.user).update(pantry_items=40, expiry_histogram={})
+        self.assertEqual(services.reconcile(), 1)
+        self.assertEqual(services.reconcile(), 0)
+        stats = self.get_stats()
+        self.assertEqual((stats['pantry_items'], stats['expiring_soon']), (1, 1))
+
+    def test_deleting_a_user_with_lots(self):
+        self.add_lot(self.milk, 1)
+        self.add_lot(self.eggs)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertFalse(UserStats.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(PantryLot.objects.exists())
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('stats:summary')).status_code, 401)
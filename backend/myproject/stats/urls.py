@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'stats'
+
+urlpatterns = [
+    path('', views.stats_view, name='summary'),
+]
@@ -0,0 +1,13 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from myproject.api import api_login_required
+
+from .services import aget_stats, summarize
+
+
+@require_GET
+@api_login_required
+async def stats_view(request):
+    """Quick stats for the dashboard: pantry size, ready dishes, expiring lots."""
+    return JsonResponse(summarize(await aget_stats(request.user.pk)))